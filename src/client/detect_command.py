@@ -1,13 +1,14 @@
 # Wake word on Windows → chime → record until silence → send PCM to Mac
-import time, json, queue, sys, os, re, asyncio
+import time, sys, os, asyncio, threading, queue
+import orjson
 import sounddevice as sd
-from vosk import Model, KaldiRecognizer
 import websockets, webrtcvad
 import numpy as np
 from pathlib import Path
 from modules.voice_synth.voice_synth import speak_async
 from modules.application_control.open_games import launch_game_by_name
 from modules.application_control.game_clip import make_clip
+from wake_word import AudioRing, start_wake_worker
 
 
 # ---- optional chime (pip install simpleaudio) ----
@@ -29,27 +30,37 @@ def make_chime(sr=24000):
     data = np.concatenate([t1, gap, t2])
     return data.tobytes(), sr
 
+# rendered once at import; play_chime only hands the buffer to simpleaudio
 _CHIME, _CHIME_SR = make_chime()
+_chime_play = None
+
 def play_chime():
+    global _chime_play
     if sa is None:
         return
     try:
-        sa.play_buffer(_CHIME, 1, 2, _CHIME_SR)  # non-blocking
+        # a re-fire cuts the previous chime short instead of overlapping it
+        if _chime_play is not None and _chime_play.is_playing():
+            _chime_play.stop()
+        _chime_play = sa.play_buffer(_CHIME, 1, 2, _CHIME_SR)  # non-blocking
     except Exception:
         pass
 
 # ---- config ----
 MODEL_DIR = str(Path(__file__).resolve().parent / "assets" / "vosk-model-small-en-us-0.15")
 SR = 16000
-BLOCK = 1600
+BLOCK = 3200  # 200 ms
+BLOCK_MS = BLOCK * 1000 // SR
+VAD_FRAME = int(0.02 * SR)  # 20 ms, what webrtcvad accepts
+NOISE_FLOOR = 300  # int16 peak below this is treated as silence without running VAD
+RING_S = 10  # seconds of audio the capture ring can hold before the oldest is overwritten
 WAKE = "jarvis"
 DEBOUNCE_S = 1.5
 WS_URI = "ws://192.168.1.97:8765"  # Mac IP:port
 SECRET = "change_me"
 ROOM = "office"  # set per-PC location
-
-def norm(s: str) -> str:
-    return re.sub(r"[^a-z ]", " ", s.lower()).strip()
+HEARTBEAT_S = 25  # app-level ping so the socket survives idle periods
+MAX_MISSED_PONGS = 2
 
 # ---- launch helper ----
 
@@ -123,10 +134,92 @@ def handle_routed_action_or_msg(payload: dict) -> None:
             print(f"[client] say -> {msg}")
             speak_async(msg)
 
-async def send_pcm(pcm_bytes: bytes, sr: int = SR):
-    if not pcm_bytes:
-        return
+# ---- persistent server link ----
+# One WebSocket for the whole session, owned by a dedicated event loop thread.
+# _WS_LOCK serialises utterances and heartbeats so replies never interleave.
+_LOOP: asyncio.AbstractEventLoop | None = None
+_WS = None
+_WS_LOCK = asyncio.Lock()
+_HEARTBEAT = None
+_PONG = '{"type": "pong"}'  # listen.py's reply to a ping, compared verbatim
+
+def start_link() -> asyncio.AbstractEventLoop:
+    """Start the link loop thread (once), its heartbeat, and an early connect."""
+    global _LOOP
+    if _LOOP is None:
+        _LOOP = asyncio.new_event_loop()
+        threading.Thread(target=_LOOP.run_forever, daemon=True, name="server-link").start()
+        asyncio.run_coroutine_threadsafe(_start_link_tasks(), _LOOP).result()
+    return _LOOP
+
+async def _start_link_tasks():
+    global _HEARTBEAT
+    _HEARTBEAT = asyncio.create_task(_heartbeat())
+    asyncio.create_task(_connect_early())
+
+async def _connect_early():
+    # pay the handshake at startup rather than on the first utterance
+    async with _WS_LOCK:
+        try:
+            await _ensure_ws()
+        except Exception as e:
+            print("[client] server not reachable yet:", e)
+
+def _log_send_error(fut) -> None:
+    if not fut.cancelled() and fut.exception() is not None:
+        print("[client] send failed:", repr(fut.exception()))
+
+async def _ensure_ws():
+    global _WS
+    if _WS is None:
+        _WS = await websockets.connect(WS_URI, max_size=None, ping_interval=30, ping_timeout=15)
+    return _WS
+
+async def _drop_ws():
+    global _WS
+    ws, _WS = _WS, None
+    if ws is not None:
+        try:
+            await ws.close()
+        except Exception:
+            pass
 
+async def _recv_reply(ws):
+    # a pong that timed out in the heartbeat can still arrive late; skip it
+    while True:
+        raw = await ws.recv()
+        if raw != _PONG:
+            return raw
+
+async def _heartbeat():
+    missed = 0
+    while True:
+        await asyncio.sleep(HEARTBEAT_S)
+        async with _WS_LOCK:
+            if _WS is None:
+                continue
+            try:
+                await _WS.send(orjson.dumps({"type": "ping", "secret": SECRET}).decode())
+                raw = await asyncio.wait_for(_WS.recv(), timeout=5)
+                missed = 0 if raw == _PONG else missed + 1
+            except asyncio.TimeoutError:
+                missed += 1
+            except Exception:
+                missed = MAX_MISSED_PONGS
+            if missed >= MAX_MISSED_PONGS:
+                print("[client] server link lost; reconnecting on next utterance")
+                await _drop_ws()
+                missed = 0
+
+_END = object()    # queue sentinel: utterance finished, ask for a reply
+_ABORT = object()  # queue sentinel: too little speech, server discards what it got
+
+async def stream_utterance(chunks: asyncio.Queue, sr: int = SR):
+    """
+    Send PCM blocks to the server as they are captured so it can start work
+    before the speaker finishes. Blocks come from `chunks`; _END closes the
+    utterance and waits for the reply, _ABORT cancels it without one.
+    """
     hdr = {
         "type": "utterance",
         "sr": sr,
@@ -135,15 +228,36 @@ async def send_pcm(pcm_bytes: bytes, sr: int = SR):
         "room": ROOM,
     }
 
-    async with websockets.connect(WS_URI, max_size=None, ping_interval=30, ping_timeout=15) as ws:
-        await ws.send(json.dumps(hdr))
-        await ws.send(pcm_bytes)
-        await ws.send("__end__")
-        raw = await ws.recv()
+    sent = []  # replayed if the socket turns out stale mid-utterance
+    ended = False
+    async with _WS_LOCK:
+        for attempt in range(2):  # stale socket -> reconnect and retry once
+            try:
+                ws = await _ensure_ws()
+                await ws.send(orjson.dumps(hdr).decode())  # text frame: binary ones are PCM
+                for b in sent:
+                    await ws.send(b)
+                while not ended:
+                    b = await chunks.get()
+                    if b is _ABORT:
+                        await ws.send("__abort__")
+                        return
+                    if b is _END:
+                        ended = True
+                        break
+                    sent.append(b)
+                    await ws.send(b)
+                await ws.send("__end__")
+                raw = await _recv_reply(ws)
+                break
+            except (OSError, websockets.ConnectionClosed):
+                await _drop_ws()
+                if attempt:
+                    raise
 
     # Parse response
     try:
-        payload = json.loads(raw)
+        payload = orjson.loads(raw)
     except Exception:
         print("Mac reply (non-JSON):", raw)
         speak_async(str(raw))
@@ -151,102 +265,106 @@ async def send_pcm(pcm_bytes: bytes, sr: int = SR):
 
     handle_routed_action_or_msg(payload)
 
-def record_until_silence(stream_q: queue.Queue, vad: webrtcvad.Vad,
-                         pre_ms=500, max_ms=8000, tail_ms=800, min_voiced_ms=200) -> bytes:
-    pcm = bytearray()
+def _block_voiced(arr: np.ndarray, is_speech) -> bool:
+    """True if any 20 ms frame in the block is speech. Quiet blocks skip VAD entirely."""
+    if not arr.size or max(int(arr.max()), -int(arr.min())) < NOISE_FLOOR:
+        return False
+    frames = arr[: (len(arr) // VAD_FRAME) * VAD_FRAME].reshape(-1, VAD_FRAME)
+    for f in frames:
+        if is_speech(f.tobytes(), SR):
+            return True
+    return False
+
+def record_until_silence(ring: AudioRing, vad: webrtcvad.Vad, sink,
+                         pre_ms=500, max_ms=8000, tail_ms=800, min_voiced_ms=1000) -> bool:
+    """
+    Capture one utterance, handing each block to `sink` (as a byte memoryview) as
+    soon as it is read. Returns False if it held too little speech to be worth
+    sending.
+    """
+    pre_blocks = -(-pre_ms // BLOCK_MS)
+    # One buffer per utterance: blocks are read straight into it and handed
+    # out as views, so nothing is copied again and no view is ever overwritten
+    utt = np.empty((pre_blocks + -(-max_ms // BLOCK_MS)) * BLOCK, dtype=np.int16)
+    n = 0
+
     # preroll
-    for _ in range(pre_ms // 100):
-        pcm.extend(stream_q.get())
+    for _ in range(pre_blocks):
+        ring.read_into(utt[n:n + BLOCK])
+        sink(utt[n:n + BLOCK].view(np.uint8).data)
+        n += BLOCK
 
     silent_ms = 0
     total_ms = 0
     voiced_ms = 0
-    step = int(0.02 * SR)  # 20 ms
+    is_speech = vad.is_speech
 
     while total_ms < max_ms:
-        b = stream_q.get()
-        pcm.extend(b)
-        total_ms += 100
-
-        arr = np.frombuffer(b, dtype=np.int16)
-        voiced = False
-        for i in range(0, len(arr), step):
-            chunk = arr[i:i+step]
-            if len(chunk) != step:
-                break
-            if vad.is_speech(chunk.tobytes(), sample_rate=SR):
-                voiced = True
-                voiced_ms += 20
-                break
+        arr = utt[n:n + BLOCK]
+        ring.read_into(arr)
+        sink(arr.view(np.uint8).data)  # byte-format view: websockets sizes frames by len()
+        n += BLOCK
+        total_ms += BLOCK_MS
 
-        if voiced:
+        if _block_voiced(arr, is_speech):
             silent_ms = 0
+            voiced_ms += BLOCK_MS
         else:
-            silent_ms += 100
+            silent_ms += BLOCK_MS
             if silent_ms >= tail_ms:
                 break
 
-    if voiced_ms < min_voiced_ms:
-        return b""
-    return bytes(pcm)
-
-def drain_queue(q: queue.Queue):
-    try:
-        while True:
-            q.get_nowait()
-    except Exception:
-        pass
+    return voiced_ms >= min_voiced_ms
 
 def main():
     if not os.path.isdir(MODEL_DIR):
         print("Model not found:", MODEL_DIR)
         sys.exit(1)
 
-    model = Model(MODEL_DIR)
-    rec = KaldiRecognizer(model, SR)
-    rec.SetWords(True)
-
-    q = queue.Queue(maxsize=50)
+    ring = AudioRing(SR * RING_S)
+    # Vosk decodes in its own process off the shared ring; this thread only
+    # wakes up for hits and to capture the utterance that follows
+    worker, hits, listening = start_wake_worker(ring, MODEL_DIR, WAKE, SR, BLOCK)
     vad = webrtcvad.Vad(2)  # 0=loose..3=strict
 
     def cb(indata, frames, t, status):
         if status:
             return
-        b = bytes(indata)
-        try:
-            q.put_nowait(b)
-        except queue.Full:
-            try:
-                q.get_nowait()
-            except queue.Empty:
-                pass
-            q.put_nowait(b)
+        ring.write(indata)
+
+    loop = start_link()
+
+    def on_wake(pos: int):
+        ring.seek(pos)  # resume where Vosk stopped decoding: the command often follows the wake word at once
+        play_chime()
+        chunks = asyncio.Queue()
+        sent = asyncio.run_coroutine_threadsafe(stream_utterance(chunks), loop)
+        sent.add_done_callback(_log_send_error)
+        push = lambda item: loop.call_soon_threadsafe(chunks.put_nowait, item)
+        voiced = record_until_silence(ring, vad, push)
+        push(_END if voiced else _ABORT)
+        # don't wait for the reply: it is handled on the link loop while we go
+        # back to listening, and _WS_LOCK keeps the next utterance behind it
+        time.sleep(0.25)
 
     last_fire = 0.0
-    with sd.InputStream(samplerate=SR, channels=1, dtype="int16", blocksize=BLOCK, callback=cb):
-        print(f"Listening for wake word: {WAKE}  (room={ROOM})")
-        while True:
-            b = q.get()
-            if rec.AcceptWaveform(b):
-                txt = norm(json.loads(rec.Result()).get("text", ""))
-                if WAKE in txt and time.time() - last_fire > DEBOUNCE_S:
-                    last_fire = time.time()
-                    play_chime()
-                    utter = record_until_silence(q, vad)
-                    asyncio.run(send_pcm(utter))
-                    drain_queue(q)
-                    time.sleep(0.25)
-                    last_fire = time.time()
-            else:
-                ptxt = norm(json.loads(rec.PartialResult()).get("partial", ""))
-                if WAKE in ptxt and time.time() - last_fire > DEBOUNCE_S:
-                    last_fire = time.time()
-                    play_chime()
-                    utter = record_until_silence(q, vad)
-                    asyncio.run(send_pcm(utter))
-                    drain_queue(q)
-                    time.sleep(0.25)
+    try:
+        with sd.InputStream(samplerate=SR, channels=1, dtype="int16", blocksize=BLOCK, callback=cb):
+            print(f"Listening for wake word: {WAKE}  (room={ROOM})")
+            while True:
+                try:
+                    pos = hits.get(timeout=1.0)  # timeout only keeps Ctrl+C responsive on Windows
+                except queue.Empty:
+                    if not worker.is_alive():
+                        print("Wake-word process exited.")
+                        sys.exit(1)
+                    continue
+                if time.time() - last_fire > DEBOUNCE_S:
+                    on_wake(pos)
                     last_fire = time.time()
+                listening.set()  # the worker resets Vosk and resumes from now
+    finally:
+        ring.close()
 
 if __name__ == "__main__":
     main()
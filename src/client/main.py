@@ -1,8 +1,7 @@
 # main.py
-import asyncio, threading, os
+import threading, os
 from pystray import Icon, MenuItem, Menu
 from PIL import Image
-import detect_command as client  # has async main()
 
 def _on_quit(icon, item):
     icon.stop()
@@ -15,5 +14,7 @@ def run_tray():
     Icon("jarvis", img, "Jarvis Assistant", menu).run()
 
 if __name__ == "__main__":
+    # imported here so the spawned wake-word process doesn't load the whole client
+    import detect_command as client  # blocking main(); server I/O runs on its own loop thread
     threading.Thread(target=run_tray, daemon=True).start()
-    asyncio.run(client.main())
+    client.main()
@@ -1,7 +1,8 @@
 import os, re, subprocess
+from functools import lru_cache
 from pathlib import Path
-from difflib import SequenceMatcher
-from typing import Dict, Tuple, List, Optional
+from typing import Any, Dict, Tuple, List, Optional, FrozenSet
+from rapidfuzz import fuzz, process
 
 # ---------------- Steam discovery ----------------
 def _steam_root_candidates():
@@ -33,6 +34,9 @@ def _steam_root_candidates():
         if p and p.exists():
             yield p
 
+_LIB_NEW_RE = re.compile(r'"\d+"\s*\{[^}]*?"path"\s*"([^"]+)"', re.DOTALL | re.IGNORECASE)
+_LIB_OLD_RE = re.compile(r'"\d+"\s*"([^"]+)"')
+
 def _parse_libraryfolders(steam_root: Path) -> List[Path]:
     """
     Return all Steam library roots listed in <root>/steamapps/libraryfolders.vdf,
@@ -46,41 +50,69 @@ def _parse_libraryfolders(steam_root: Path) -> List[Path]:
     t = vdf.read_text(encoding="utf-8", errors="ignore")
 
     # New format blocks: "1" { "path" "D:\\SteamLibrary" ... }
-    for m in re.finditer(r'"\d+"\s*\{[^}]*?"path"\s*"([^"]+)"', t, re.DOTALL | re.IGNORECASE):
+    for m in _LIB_NEW_RE.finditer(t):
         libs.add(Path(m.group(1)))
 
     # Old format lines: "1" "D:\\SteamLibrary"
     if len(libs) == 1:
-        for m in re.finditer(r'"\d+"\s*"([^"]+)"', t):
+        for m in _LIB_OLD_RE.finditer(t):
             libs.add(Path(m.group(1)))
 
     return [p for p in libs if (p / "steamapps").exists()]
 
+# Only the two header keys we need; both sit near the top of every manifest
+_ACF_KV_RE = re.compile(rb'"(appid|name)"\s+"([^"]+)"', re.IGNORECASE)
+_ACF_HEAD = 4096
+
+def _acf_pick(data: bytes) -> Dict[bytes, bytes]:
+    found: Dict[bytes, bytes] = {}
+    for m in _ACF_KV_RE.finditer(data):
+        found.setdefault(m.group(1).lower(), m.group(2))
+        if len(found) == 2:
+            break
+    return found
+
+def _read_acf_keys(path: str) -> Tuple[Optional[str], Optional[str]]:
+    with open(path, "rb") as f:
+        data = f.read(_ACF_HEAD)
+        found = _acf_pick(data)
+        if len(found) < 2:  # unusually long header: fall back to the whole file
+            found = _acf_pick(data + f.read())
+    appid, name = found.get(b"appid"), found.get(b"name")
+    return (appid.decode("ascii", "ignore") if appid else None,
+            name.decode("utf-8", "ignore") if name else None)
+
 def _scan_manifests(steamapps_dir: Path) -> Dict[str, str]:
     """
     Parse appmanifest_*.acf in a steamapps directory.
     Returns {appid: game_name}.
     """
     out: Dict[str, str] = {}
-    pat = re.compile(r'"([^"]+)"\s+"([^"]+)"')
-    for acf in steamapps_dir.glob("appmanifest_*.acf"):
-        data = acf.read_text(encoding="utf-8", errors="ignore")
-        appid = name = None
-        for k, v in pat.findall(data):
-            if k == "appid": appid = v
-            elif k == "name": name = v
-        if appid and name:
-            out[appid] = name
+    try:
+        entries = os.scandir(steamapps_dir)
+    except OSError:
+        return out
+    with entries:
+        for e in entries:
+            if not (e.name.startswith("appmanifest_") and e.name.endswith(".acf")):
+                continue
+            try:
+                appid, name = _read_acf_keys(e.path)
+            except OSError:
+                continue
+            if appid and name:
+                out[appid] = name
     return out
 
-def get_all_installed_steam_games() -> Dict[str, str]:
-    roots = list(_steam_root_candidates())
-    if not roots:
-        raise FileNotFoundError("Steam root not found.")
-    steam_root = roots[0]
+@lru_cache(maxsize=1)
+def _steam_root() -> Path:
+    for p in _steam_root_candidates():
+        return p
+    raise FileNotFoundError("Steam root not found.")
 
+def _scan_libraries(libs) -> Dict[str, str]:
     games: Dict[str, str] = {}
-    for lib in set(_parse_libraryfolders(steam_root)):
+    for lib in libs:
         steamapps = lib / "steamapps"
         try:
             if steamapps.exists():
@@ -89,29 +121,90 @@ def get_all_installed_steam_games() -> Dict[str, str]:
             pass
     return games
 
+def get_all_installed_steam_games() -> Dict[str, str]:
+    return _scan_libraries(set(_parse_libraryfolders(_steam_root())))
+
+# ---------------- Cached index ----------------
+# Rebuilt only when libraryfolders.vdf or a steamapps dir changes (installs and
+# uninstalls add/remove appmanifest files, which bumps the directory mtime).
+_CACHE: Dict[str, Any] = {
+    "vdf_mtime": None, "libs": None, "stamp": None, "games": None, "aliases": None, "choices": None,
+}
+
+def _mtime(p: Path) -> Optional[int]:
+    try:
+        return p.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def get_game_index() -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+    """Return (appid_to_name, alias_index, search_choices), rescanning disk only if a library changed."""
+    root = _steam_root()
+    vdf_mtime = _mtime(root / "steamapps" / "libraryfolders.vdf")
+    if _CACHE["libs"] is None or vdf_mtime != _CACHE["vdf_mtime"]:
+        _CACHE["libs"] = sorted(set(_parse_libraryfolders(root)))
+        _CACHE["vdf_mtime"] = vdf_mtime
+        _CACHE["stamp"] = None
+
+    stamp = tuple(_mtime(lib / "steamapps") for lib in _CACHE["libs"])
+    if stamp != _CACHE["stamp"] or _CACHE["games"] is None:
+        games = _scan_libraries(_CACHE["libs"])
+        _CACHE["games"] = games
+        _CACHE["aliases"] = build_alias_index(games)
+        _CACHE["choices"] = build_search_choices(games, _CACHE["aliases"])
+        _CACHE["stamp"] = stamp
+    return _CACHE["games"], _CACHE["aliases"], _CACHE["choices"]
+
 # ---------------- Search helpers ----------------
 _strip_words = {
     "the","and","edition","definitive","remastered","game","of","to","for",
     "ii","iii","iv","v","vi","vii","online","special","enhanced","ultimate"
 }
 
+_SYM_RE = re.compile(r"[®™©]")
+_PUNCT_RE = re.compile(r"[-_:,.()'\[\]]")
+_WS_RE = re.compile(r"\s+")
+_EDITION_RE = re.compile(r"\b(remastered|definitive|enhanced|special|ultimate)\b")
+
+# Game names are normalized over and over while building the alias index
+@lru_cache(maxsize=4096)
 def _norm(s: str) -> str:
-    s = s.lower()
-    s = re.sub(r"[®™©]", "", s)
-    s = re.sub(r"[-_:,.()'\[\]]", " ", s)
-    return re.sub(r"\s+", " ", s).strip()
+    s = _SYM_RE.sub("", s.lower())
+    s = _PUNCT_RE.sub(" ", s)
+    return _WS_RE.sub(" ", s).strip()
 
 def _acronym(s: str) -> str:
     toks = [w for w in _norm(s).split() if w and w not in _strip_words]
     return "".join(w[0] for w in toks)
 
-def _token_set_ratio(a: str, b: str) -> float:
-    A, B = set(_norm(a).split()), set(_norm(b).split())
+def _blend_score(a: str, A: set, b: str, B: set) -> float:
+    """0.6 * token Jaccard + 0.4 * edit similarity, over normalized strings and their token sets."""
     if not A or not B:
         return 0.0
     jaccard = len(A & B) / len(A | B)
-    sm = SequenceMatcher(None, _norm(a), _norm(b)).ratio()
-    return 0.6 * jaccard + 0.4 * sm
+    return 0.6 * jaccard + 0.4 * fuzz.ratio(a, b) / 100.0
+
+@lru_cache(maxsize=4096)
+def _tokset(s: str) -> FrozenSet[str]:
+    return frozenset(s.split())
+
+def _best_blend(qn: str, labels: List[str], min_score: float) -> Optional[Tuple[str, float]]:
+    """Highest-scoring label by _blend_score (first wins ties), if it reaches min_score."""
+    if min_score > 0.4:
+        # Without a shared token the blend is at most 0.4, so only labels sharing one can win.
+        # partial_token_set_ratio is 100 for exactly those (plus a few exact substrings): one
+        # native batch pass narrows the field before the Python blend runs.
+        pool = sorted(i for _, _, i in process.extract(
+            qn, labels, scorer=fuzz.partial_token_set_ratio, score_cutoff=100, limit=None))
+    else:
+        pool = range(len(labels))
+    qt = _tokset(qn)
+    best = None
+    for i in pool:
+        score = _blend_score(qn, qt, labels[i], _tokset(labels[i]))
+        if score >= min_score and (best is None or score > best[1]):
+            best = (labels[i], score)
+    return best
 
 def _find_appid_contains(appid_to_name: Dict[str, str], *substrs: str) -> Optional[str]:
     subs = [s for s in (_norm(x) for x in substrs) if s]
@@ -131,8 +224,7 @@ def build_alias_index(appid_to_name: Dict[str, str]) -> Dict[str, str]:
         ac = _acronym(name)
         if len(ac) >= 2:
             alias[ac] = appid
-        base = re.sub(r"\b(remastered|definitive|enhanced|special|ultimate)\b", "", n)
-        base = re.sub(r"\s+", " ", base).strip()
+        base = _WS_RE.sub(" ", _EDITION_RE.sub("", n)).strip()
         if base and base != n:
             alias[base] = appid
 
@@ -163,14 +255,16 @@ def build_alias_index(appid_to_name: Dict[str, str]) -> Dict[str, str]:
     bind_group("489830", [["skyrim","special","edition"],["the","elder","scrolls","v","skyrim"]],
                ["skyrim se","skyrim special edition","skyrim"])
 
-    # Fallback manual aliases via fuzzy
+    # Fallback manual aliases via fuzzy (names normalized and tokenized once, not per alias)
+    normed = [(appid, n, set(n.split())) for appid, n in ((i, _norm(nm)) for i, nm in appid_to_name.items())]
     for a in ["counter strike","counter-strike","playerunknowns battlegrounds","pubg"]:
         na = _norm(a)
         if na in alias:
             continue
+        toks = set(na.split())
         best = None
-        for appid, name in appid_to_name.items():
-            s = _token_set_ratio(a, name)
+        for appid, n, ntoks in normed:
+            s = _blend_score(na, toks, n, ntoks)
             if not best or s > best[1]:
                 best = (appid, s)
         if best and best[1] >= 0.55:
@@ -178,8 +272,14 @@ def build_alias_index(appid_to_name: Dict[str, str]) -> Dict[str, str]:
 
     return alias
 
+def build_search_choices(appid_to_name: Dict[str, str], alias_index: Dict[str, str]) -> Dict[str, str]:
+    """Normalized label -> appid over installed names and aliases, for the fuzzy pass."""
+    choices = {_norm(name): appid for appid, name in appid_to_name.items()}
+    choices.update(alias_index)  # alias keys are already normalized
+    return choices
+
 def search_game(query: str, appid_to_name: Dict[str, str], alias_index: Dict[str, str],
-                min_score: float = 0.58) -> Tuple[str, str, float] | None:
+                min_score: float = 0.58, choices: Optional[Dict[str, str]] = None) -> Tuple[str, str, float] | None:
     qn = _norm(query)
 
     # exact alias
@@ -193,28 +293,15 @@ def search_game(query: str, appid_to_name: Dict[str, str], alias_index: Dict[str
         appid = alias_index[qa]
         return appid, appid_to_name[appid], 0.95
 
-    # fuzzy across names and aliases
-    candidates: List[Tuple[str, str]] = []
-    for appid, name in appid_to_name.items():
-        candidates.append((appid, name))
-    for al, appid in alias_index.items():
-        candidates.append((appid, al))
-
-    best_per_app: Dict[str, float] = {}
-    best_label: Dict[str, str] = {}
-    for appid, label in candidates:
-        score = _token_set_ratio(query, label)
-        if score > best_per_app.get(appid, -1.0):
-            best_per_app[appid] = score
-            best_label[appid] = appid_to_name[appid]
-
-    if not best_per_app:
+    # fuzzy across names and aliases (rapidfuzz scores 0..100)
+    if choices is None:
+        choices = build_search_choices(appid_to_name, alias_index)
+    hit = _best_blend(qn, list(choices), min_score)
+    if not hit:
         return None
-    appid_best = max(best_per_app.items(), key=lambda x: x[1])[0]
-    score_best = best_per_app[appid_best]
-    if score_best >= min_score:
-        return appid_best, best_label[appid_best], score_best
-    return None
+    label, score = hit
+    appid = choices[label]
+    return appid, appid_to_name[appid], score
 
 # ---------------- Launcher ----------------
 def launch_steam_game(appid: str):
@@ -224,9 +311,8 @@ def launch_steam_game(appid: str):
         subprocess.Popen(["steam", f"steam://rungameid/{appid}"])
 
 def launch_game_by_name(query: str) -> str:
-    games = get_all_installed_steam_games()
-    aliases = build_alias_index(games)
-    hit = search_game(query, games, aliases)
+    games, aliases, choices = get_game_index()
+    hit = search_game(query, games, aliases, choices=choices)
     if not hit:
         return "Game not found."
     appid, name, _ = hit
@@ -236,14 +322,13 @@ def launch_game_by_name(query: str) -> str:
 
 # ---------- example ----------
 if __name__ == "__main__":
-    games = get_all_installed_steam_games()
-    aliases = build_alias_index(games)
+    games, aliases, choices = get_game_index()
 
     print(f"Installed games: {len(games)}")
     print("Try: cs2, counter strike, dota, gta v, skyrim se")
 
     for q in ["csgo", "cs2", "counter strike global offensive", "gta v", "rl", "skyrim se", "command and conquer", "soundpad"]:
-        hit = search_game(q, games, aliases)
+        hit = search_game(q, games, aliases, choices=choices)
         print(q, "->", hit)
 
     # launch example:
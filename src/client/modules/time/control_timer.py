@@ -7,35 +7,32 @@ try:
     import simpleaudio as sa  # pip install simpleaudio
 except Exception:
     sa = None
-import math
+import numpy as np
+
+def _render_beep(freq_hz: float, dur_s: float = 0.12, sr: int = 44100, glide: float = 1.03) -> bytes:
+    n = int(sr * dur_s)
+    i = np.arange(n)
+    t = i / sr
+    # tiny upward glide
+    f = freq_hz * (1.0 + (glide - 1.0) * i / (n - 1))
+    # add a bit of 2nd harmonic for "alarm" bite
+    s = np.sin(2*np.pi*f*t) + 0.35 * np.sin(2*np.pi*2*f*t)
+    # fast attack + exponential decay envelope
+    env = np.minimum(t / 0.01, 1.0) * np.exp(-5.0 * t / dur_s)
+    return (32767 * 0.22 * s * env).astype(np.int16).tobytes()
+
+_BEEP_SR = 44100
+_BEEP_S = 0.12
+_BEEP_PCM = _render_beep(720, _BEEP_S, _BEEP_SR)  # try 580–700 to taste
 
 def _ring_once():
     """Beep-beep pattern: 1.0 kHz then 1.4 kHz with short gaps."""
     if sa:
-      def _beep(freq_hz: float, dur_s: float = 0.12, sr: int = 44100, glide: float = 1.03):
-          n = int(sr * dur_s)
-          samples = bytearray()
-          for i in range(n):
-              t = i / sr
-              # tiny upward glide
-              f = freq_hz * (1.0 + (glide - 1.0) * i / (n - 1))
-              # add a bit of 2nd harmonic for "alarm" bite
-              s = math.sin(2*math.pi*f*t) + 0.35 * math.sin(2*math.pi*2*f*t)
-              # fast attack + exponential decay envelope
-              attack = min(t / 0.01, 1.0)                 # ~10 ms attack
-              env = attack * math.exp(-5.0 * t / dur_s)   # percussive decay
-              v = int(32767 * 0.22 * s * env)
-              samples += v.to_bytes(2, "little", signed=True)
-          sa.play_buffer(bytes(samples), 1, 2, sr).wait_done()
-
-      def play_timer_alarm():
-          base = 720  # try 580–700 to taste
-          for _ in range(8):
-              _beep(base, 0.12); time.sleep(0.08)
-              _beep(base, 0.12); time.sleep(0.08)
-              _beep(base, 0.12); time.sleep(0.35)
-
-      play_timer_alarm()
+      # play_buffer is non-blocking, so one sleep covers the beep and the gap after it
+      for _ in range(8):
+          for gap in (0.08, 0.08, 0.35):
+              sa.play_buffer(_BEEP_PCM, 1, 2, _BEEP_SR)
+              time.sleep(_BEEP_S + gap)
 
     elif platform.system() == "Windows":
         print("Windows Alarm")
@@ -1,7 +1,8 @@
 import os
-import time
 import wave
+import hashlib
 import threading
+from collections import OrderedDict
 from pathlib import Path
 
 try:
@@ -49,27 +50,78 @@ def _resolve_model_path() -> str:
     )
 
 
+def _load_voice(model_path: str) -> PiperVoice:
+    # tools/quantize_piper_voice.py writes an int8 copy beside the model; it reuses the fp32 model's config
+    int8 = Path(model_path).with_suffix(".int8.onnx")
+    if int8.exists():
+        return PiperVoice.load(int8, config_path=f"{model_path}.json")
+    return PiperVoice.load(model_path)
+
 MODEL_PATH = _resolve_model_path()
-_voice = PiperVoice.load(MODEL_PATH)
+_voice = _load_voice(MODEL_PATH)
 
 _audio_dir = (Path(__file__).resolve().parent / "temp_audio")
 _audio_dir.mkdir(parents=True, exist_ok=True)
 
-def speak(message: str) -> str:
-    """Synthesize and (if available) play speech. Returns WAV path."""
-    filename = _audio_dir / f"tts_{int(time.time()*1000)}.wav"
-    # synthesize
-    with wave.open(str(filename), "wb") as f:
+# ---- phrase cache ----
+# Replies repeat a lot ("Clipped.", "Launching X"), so each message is rendered
+# once to cache/<hash>.wav and its decoded WaveObject kept in memory. LRU-bounded
+# on disk; files left from earlier runs are picked up oldest-first.
+_cache_dir = _audio_dir / "cache"
+_cache_dir.mkdir(parents=True, exist_ok=True)
+_CACHE_MAX = 64
+_cache: "OrderedDict[str, object]" = OrderedDict()  # key -> WaveObject, or None until first play
+_cache_lock = threading.Lock()
+
+def _trim_cache() -> None:
+    """Drop least recently used renders past _CACHE_MAX (hold _cache_lock)."""
+    while len(_cache) > _CACHE_MAX:
+        old, _ = _cache.popitem(last=False)
+        (_cache_dir / f"{old}.wav").unlink(missing_ok=True)
+
+for _p in sorted(_cache_dir.glob("*.wav"), key=lambda p: p.stat().st_mtime):
+    _cache[_p.stem] = None
+_trim_cache()  # a previous run may have left more than the limit
+
+def _render_cached(message: str) -> tuple:
+    """Return (key, wav_path) for message, synthesizing only on a cache miss."""
+    key = hashlib.blake2b(message.encode("utf-8"), digest_size=16).hexdigest()
+    path = _cache_dir / f"{key}.wav"
+    with _cache_lock:
+        hit = key in _cache and path.exists()
+        if hit:
+            _cache.move_to_end(key)
+    if hit:
+        return key, path
+
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    with wave.open(str(tmp), "wb") as f:
         _voice.synthesize_wav(message, f)
+    os.replace(tmp, path)
+    with _cache_lock:
+        _cache[key] = None
+        _cache.move_to_end(key)
+        _trim_cache()
+    return key, path
+
+def speak(message: str) -> str:
+    """Synthesize (or reuse a cached render) and, if available, play speech. Returns WAV path."""
+    key, path = _render_cached(message)
     # play if simpleaudio present
     if audio is not None:
         try:
-            wave_obj = audio.WaveObject.from_wave_file(str(filename))
+            with _cache_lock:
+                wave_obj = _cache.get(key)
+            if wave_obj is None:
+                wave_obj = audio.WaveObject.from_wave_file(str(path))
+                with _cache_lock:
+                    if key in _cache:
+                        _cache[key] = wave_obj
             play_obj = wave_obj.play()
             play_obj.wait_done()
         except Exception:
             pass
-    return str(filename)
+    return str(path)
 
 def speak_async(message: str) -> None:
     threading.Thread(target=speak, args=(message,), daemon=True).start()
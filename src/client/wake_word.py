@@ -0,0 +1,141 @@
+# Mic capture ring shared with a child process that runs Vosk wake-word decoding
+import re, time, threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+import orjson
+
+_NON_ALPHA_RE = re.compile(r"[^a-z ]")
+_POLL_S = 0.01  # how often the Vosk process checks the ring for new audio
+
+def norm(s: str) -> str:
+    return _NON_ALPHA_RE.sub(" ", s.lower()).strip()
+
+class AudioRing:
+    """
+    Preallocated int16 ring written by the audio callback and read by one consumer
+    per instance. The callback only copies samples in and bumps a counter: no lock,
+    no per-block allocation. If a reader falls a full ring behind, the oldest audio
+    is dropped.
+
+    Samples and the write counter live in shared memory, so another process can
+    attach its own reader with AudioRing(capacity, name=ring.name, poll=seconds).
+    That reader polls the write counter instead of waiting on an event, so the
+    callback never touches a cross-process lock.
+    """
+    def __init__(self, capacity: int, name: str | None = None, poll: float | None = None):
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=8 + 2 * capacity)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = name is None
+        self._wc = np.ndarray((1,), dtype=np.uint64, buffer=self._shm.buf)  # total samples written
+        self._buf = np.ndarray((capacity,), dtype=np.int16, buffer=self._shm.buf, offset=8)
+        if self._owner:
+            self._wc[0] = 0
+        self._cap = capacity
+        self._r = int(self._wc[0])  # total samples read by this instance
+        self._poll = poll
+        self._ready = threading.Event()  # set on every write; only readers in this process can wait on it
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        return self._cap
+
+    @property
+    def position(self) -> int:
+        """Total samples read by this instance; another reader can seek() to it."""
+        return self._r
+
+    def seek(self, pos: int) -> None:
+        """Continue reading from absolute sample position pos."""
+        self._r = pos
+
+    def write(self, samples: np.ndarray) -> None:
+        x = samples.reshape(-1)[-self._cap:]
+        n = len(x)
+        w = int(self._wc[0])
+        i = w % self._cap
+        first = min(n, self._cap - i)
+        self._buf[i:i + first] = x[:first]
+        self._buf[:n - first] = x[first:]
+        self._wc[0] = w + n  # publish only after the samples are in place
+        self._ready.set()
+
+    def _take(self, n: int) -> tuple:
+        """Block until n samples are available; return them as one or two ring views."""
+        while int(self._wc[0]) - self._r < n:
+            if self._poll:
+                time.sleep(self._poll)
+            else:
+                self._ready.wait()
+                self._ready.clear()
+        w = int(self._wc[0])
+        if w - self._r > self._cap:
+            self._r = w - self._cap
+        i = self._r % self._cap
+        self._r += n
+        if i + n <= self._cap:
+            return (self._buf[i:i + n],)
+        return self._buf[i:], self._buf[:n - (self._cap - i)]
+
+    def read_into(self, out: np.ndarray) -> None:
+        """Block until len(out) samples are available and copy them straight into out."""
+        parts = self._take(len(out))
+        out[:len(parts[0])] = parts[0]
+        if len(parts) == 2:
+            out[len(parts[0]):] = parts[1]
+
+    def read_bytes(self, n: int) -> bytes:
+        """Block until n samples are available and return them as bytes in a single copy (what Vosk wants)."""
+        parts = self._take(n)
+        return parts[0].tobytes() if len(parts) == 1 else b"".join(p.tobytes() for p in parts)
+
+    def clear(self) -> None:
+        """Discard everything captured so far."""
+        self._r = int(self._wc[0])
+
+    def close(self) -> None:
+        del self._wc, self._buf  # views must go before the mapping can close
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+def _wake_worker(ring_name, capacity, listening, hits, model_dir, wake, sr, block):
+    """
+    Child process: decode the shared ring with Vosk and put its ring read
+    position on `hits` whenever the wake word is heard, so the parent captures
+    the command from exactly where decoding stopped. After a hit it pauses
+    (clears `listening`) until the parent has captured the utterance and sets
+    it again.
+    """
+    from vosk import Model, KaldiRecognizer
+    rec = KaldiRecognizer(Model(model_dir), sr)
+    rec.SetWords(True)
+    ring = AudioRing(capacity, name=ring_name, poll=_POLL_S)
+    while True:
+        if not listening.is_set():
+            listening.wait()
+            ring.clear()
+            rec.Reset()  # drop the wake phrase so the next partial can't re-fire on it
+        b = ring.read_bytes(block)
+        if rec.AcceptWaveform(b):
+            txt = norm(orjson.loads(rec.Result()).get("text", ""))
+        else:
+            txt = norm(orjson.loads(rec.PartialResult()).get("partial", ""))
+        if wake in txt:
+            listening.clear()
+            hits.put(ring.position)
+
+def start_wake_worker(ring: AudioRing, model_dir: str, wake: str, sr: int, block: int):
+    """Spawn the Vosk process on `ring`. Returns (process, hits queue of ring positions, listening event)."""
+    listening, hits = mp.Event(), mp.Queue()
+    listening.set()
+    proc = mp.Process(target=_wake_worker, name="vosk-wake", daemon=True,
+                      args=(ring.name, ring.capacity, listening, hits, model_dir, wake, sr, block))
+    proc.start()
+    return proc, hits, listening
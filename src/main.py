@@ -1,23 +1,36 @@
 import time
+import queue
 from modules.facial_recognition.greetings import process_recognitions, start_face_recognition
 from modules.smart_devices import *
 from modules.voice_recognition import start_voice_commands
 import sounddevice as sd
 from sounddevice import PortAudioError
 from modules.smart_devices.interpret_smart_command import execute_command
-import re
 from modules.smart_devices.interpret_smart_command import execute_command
 
 #Hardcoded for now, hopefully in future can be taken from microphone location
 ROOM_COMMAND_GIVEN = "office"
 
-WAKE_PHRASE = "hey jarvis"
+# Face greetings are off for now; True starts the camera thread and greets from its events
+FACE_RECOGNITION = False
+
+WAKE_PHRASES = ("hey jarvis",)
 _last_command_time = 0
 _WAKE_WINDOW = 3  # seconds
+_STRIP_PUNCT = str.maketrans("", "", ".,")
+
+def _after_wake(cleaned: str) -> str | None:
+    """Text following the earliest wake phrase in cleaned, or None if none is present."""
+    best = None
+    for phrase in WAKE_PHRASES:
+        idx = cleaned.find(phrase)
+        if idx != -1 and (best is None or idx < best[0]):
+            best = (idx, idx + len(phrase))
+    return None if best is None else cleaned[best[1]:]
 
 def on_voice_command(text: str):
     global _last_command_time
-    cleaned = re.sub(r"[.,]", "", text).lower()
+    cleaned = text.translate(_STRIP_PUNCT).lower()
     now = time.time()
 
     # inside wake window → run directly
@@ -33,9 +46,9 @@ def on_voice_command(text: str):
     #    return
     
     # otherwise require wake phrase
-    idx = cleaned.find(WAKE_PHRASE)
-    if idx != -1:
-        cmd = cleaned[idx + len(WAKE_PHRASE):].strip()
+    rest = _after_wake(cleaned)
+    if rest is not None:
+        cmd = rest.strip()
         if cmd:
             print("\nVOICE:", text)
             result = execute_command(text=cmd, room=ROOM_COMMAND_GIVEN)
@@ -46,7 +59,7 @@ def on_voice_command(text: str):
 
 
 def main():
-    #recognized_faces = []
+    face_events = queue.Queue()
 
     mic_index = 1
     try:
@@ -63,34 +76,45 @@ def main():
         handler=on_voice_command,
         device=device,
         sample_rate=sr,
-        model_name="large-v3"  # change to medium.en if you want faster but slightly less accurate
+        model_name="large-v3",  # fallback for anything the fast pass is unsure about
+        fast_model_name="distil-small.en"
     )
 
-    #face_thread = start_face_recognition(recognized_faces)
+    face_thread = start_face_recognition(face_events) if FACE_RECOGNITION else None
     start_console_command_listener(room=ROOM_COMMAND_GIVEN)
 
     print("AI Assistant started. Waiting for recognitions...")
 
     try:
         while True:
-            #process_recognitions(recognized_faces)
-            time.sleep(0.1)
+            if face_thread is None:
+                time.sleep(1.0)  # nothing to consume; voice and console run on their own threads
+                continue
+            # Blocks until the face thread reports something; the timeout only
+            # keeps Ctrl+C responsive on Windows, where a bare get() ignores it
+            try:
+                faces = face_events.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            process_recognitions(faces)
     except KeyboardInterrupt:
         print("Stopping...")
     finally:
         print("Stopped")
         voice_thread.stop()
         voice_thread.join()
-        #face_thread.stop()
-        #face_thread.join()
+        if face_thread is not None:
+            face_thread.stop()
+            face_thread.join()
 
 
 def main_small():
     
-    start_console_command_listener(room=ROOM_COMMAND_GIVEN)
+    console = start_console_command_listener(room=ROOM_COMMAND_GIVEN)
 
-    while True:
-        time.sleep(0.1)
+    # nothing else to do until the console closes; the timeout keeps Ctrl+C responsive on Windows
+    while console.is_alive():
+        console.join(timeout=1.0)
 
 
 
@@ -1,7 +1,9 @@
 import os, re, subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from difflib import SequenceMatcher
-from typing import Dict, Tuple, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Tuple, List, Optional, FrozenSet
+from rapidfuzz import fuzz, process
 
 # ---------- existing pieces (root + libraries + manifests) ----------
 def _steam_root_candidates():
@@ -30,72 +32,175 @@ def _steam_root_candidates():
         if p.exists():
             yield p
 
+_LIB_NEW_RE = re.compile(r'"\d+"\s*\{[^}]*?"path"\s*"([^"]+)"', re.DOTALL | re.IGNORECASE)
+_LIB_OLD_RE = re.compile(r'"\d+"\s*"([^"]+)"')
+
 def _parse_libraryfolders(steam_root: Path) -> List[Path]:
     libs = {steam_root}
     vdf = steam_root / "steamapps" / "libraryfolders.vdf"
     if vdf.exists():
         t = vdf.read_text(encoding="utf-8", errors="ignore")
-        for m in re.finditer(r'"\d+"\s*\{[^}]*?"path"\s*"([^"]+)"', t, re.DOTALL | re.IGNORECASE):
+        for m in _LIB_NEW_RE.finditer(t):
             libs.add(Path(m.group(1)))
         if len(libs) == 1:
-            for m in re.finditer(r'"\d+"\s*"([^"]+)"', t):
+            for m in _LIB_OLD_RE.finditer(t):
                 libs.add(Path(m.group(1)))
     return [p for p in libs if p.exists()]
 
+# Only appid and name are needed and both sit in the first few lines of a manifest
+_ACF_KV_RE = re.compile(rb'"(appid|name)"\s+"([^"]+)"', re.IGNORECASE)
+_ACF_HEAD = 4096
+
+def _acf_pick(data: bytes) -> Dict[bytes, bytes]:
+    found: Dict[bytes, bytes] = {}
+    for m in _ACF_KV_RE.finditer(data):
+        found.setdefault(m.group(1).lower(), m.group(2))
+        if len(found) == 2:
+            break
+    return found
+
+def _read_acf_keys(path: str) -> Tuple[Optional[str], Optional[str]]:
+    with open(path, "rb") as f:
+        data = f.read(_ACF_HEAD)
+        found = _acf_pick(data)
+        if len(found) < 2:  # unusually long header: fall back to the whole file
+            found = _acf_pick(data + f.read())
+    appid, name = found.get(b"appid"), found.get(b"name")
+    return (appid.decode("ascii", "ignore") if appid else None,
+            name.decode("utf-8", "ignore") if name else None)
+
 def _scan_manifests(steamapps_dir: Path) -> Dict[str, str]:
     out: Dict[str, str] = {}
-    pat = re.compile(r'"([^"]+)"\s+"([^"]+)"')
-    for acf in steamapps_dir.glob("appmanifest_*.acf"):
-        data = acf.read_text(encoding="utf-8", errors="ignore")
-        appid = name = None
-        for k, v in pat.findall(data):
-            if k == "appid": appid = v
-            elif k == "name": name = v
-        if appid and name:
-            out[appid] = name
+    try:
+        entries = os.scandir(steamapps_dir)
+    except OSError:
+        return out
+    with entries:
+        for e in entries:
+            if not (e.name.startswith("appmanifest_") and e.name.endswith(".acf")):
+                continue
+            try:
+                appid, name = _read_acf_keys(e.path)
+            except OSError:
+                continue
+            if appid and name:
+                out[appid] = name
     return out
 
-def get_all_installed_steam_games() -> Dict[str, str]:
-    roots = list(_steam_root_candidates())
-    if not roots:
-        raise FileNotFoundError("Steam root not found.")
-    steam_root = roots[0]
+def _steam_root() -> Path:
+    for p in _steam_root_candidates():
+        return p
+    raise FileNotFoundError("Steam root not found.")
+
+def _library_dirs(steam_root: Path) -> List[Path]:
     libs = set(_parse_libraryfolders(steam_root))
     for drive in map(lambda d: f"{d}:\\", "CDEFGHIJKLMNOPQRSTUVWXYZ"):
         p = Path(drive) / "SteamLibrary"
         if (p / "steamapps").exists():
             libs.add(p)
+    return sorted(libs)
+
+def _scan_libraries(libs: List[Path]) -> Dict[str, str]:
+    # Libraries usually sit on different drives, so scan them side by side
+    dirs = [lib / "steamapps" for lib in libs if (lib / "steamapps").exists()]
     games: Dict[str, str] = {}
-    for lib in libs:
-        sp = lib / "steamapps"
-        if sp.exists():
-            games.update(_scan_manifests(sp))
+    if not dirs:
+        return games
+    with ThreadPoolExecutor(max_workers=min(8, len(dirs))) as ex:
+        for found in ex.map(_scan_manifests, dirs):
+            games.update(found)
     return games
 
+def get_all_installed_steam_games() -> Dict[str, str]:
+    return _scan_libraries(_library_dirs(_steam_root()))
+
+# ---------- cached index ----------
+# Rebuilt only when libraryfolders.vdf or a steamapps dir changes (installs and
+# uninstalls add/remove appmanifest files, which bumps the directory mtime).
+_CACHE: Dict[str, Any] = {
+    "vdf_mtime": None, "libs": None, "sig": None, "games": None, "aliases": None, "search": None,
+}
+
+def _mtime(p: Path) -> Optional[int]:
+    try:
+        return p.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def get_game_index() -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+    """Return (appid_to_name, alias_index, search_index), rescanning disk only if a library changed."""
+    root = _steam_root()
+    vdf_mtime = _mtime(root / "steamapps" / "libraryfolders.vdf")
+    if _CACHE["libs"] is None or vdf_mtime != _CACHE["vdf_mtime"]:
+        _CACHE["libs"] = _library_dirs(root)
+        _CACHE["vdf_mtime"] = vdf_mtime
+        _CACHE["sig"] = None
+
+    sig = tuple(_mtime(lib / "steamapps") for lib in _CACHE["libs"])
+    if sig != _CACHE["sig"] or _CACHE["games"] is None:
+        games = _scan_libraries(_CACHE["libs"])
+        names = build_name_index(games)
+        _CACHE["games"] = games
+        _CACHE["aliases"] = build_alias_index(games, names)
+        _CACHE["search"] = build_search_index(names, _CACHE["aliases"])
+        _CACHE["sig"] = sig
+    return _CACHE["games"], _CACHE["aliases"], _CACHE["search"]
+
 # ---------- search helpers ----------
 _strip_words = {"the","and","edition","definitive","remastered","game","of","to","for","ii","iii","iv","v","vi","vii","online","special","enhanced","ultimate"}
 
+_SYM_RE = re.compile(r"[®™©]")
+_PUNCT_RE = re.compile(r"[-_:,.()'\\[\\]]")
+_WS_RE = re.compile(r"\s+")
+_EDITION_RE = re.compile(r"\b(remastered|definitive|enhanced|special|ultimate)\b")
+
 def _norm(s: str) -> str:
-    s = s.lower()
-    s = re.sub(r"[®™©]", "", s)
-    s = re.sub(r"[-_:,.()'\\[\\]]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = _SYM_RE.sub("", s.lower())
+    s = _PUNCT_RE.sub(" ", s)
+    return _WS_RE.sub(" ", s).strip()
 
 def _acronym(s: str) -> str:
-    toks = [w for w in re.split(r"\s+", _norm(s)) if w and w not in _strip_words]
+    toks = [w for w in _norm(s).split() if w and w not in _strip_words]
     return "".join(w[0] for w in toks)
 
-def _token_set_ratio(a: str, b: str) -> float:
-    A = set(_norm(a).split())
-    B = set(_norm(b).split())
+def _token_set_ratio(a: str, A: FrozenSet[str], b: str, B: FrozenSet[str]) -> float:
+    """Score two already-normalized strings, given their token sets."""
     if not A or not B:
         return 0.0
     inter = len(A & B)
     union = len(A | B)
     jaccard = inter / union
-    sm = SequenceMatcher(None, _norm(a), _norm(b)).ratio()
-    return 0.6 * jaccard + 0.4 * sm
+    return 0.6 * jaccard + 0.4 * fuzz.ratio(a, b) / 100.0
+
+@lru_cache(maxsize=4096)
+def _tokset(s: str) -> FrozenSet[str]:
+    return frozenset(s.split())
+
+def _best_blend(qn: str, labels: List[str], min_score: float) -> Optional[Tuple[str, float]]:
+    """Highest-scoring label by _token_set_ratio (first wins ties), if it reaches min_score."""
+    if min_score > 0.4:
+        # Without a shared token the blend is at most 0.4, so only labels sharing one can win.
+        # partial_token_set_ratio is 100 for exactly those (plus a few exact substrings): one
+        # native batch pass narrows the field before the Python blend runs.
+        pool = sorted(i for _, _, i in process.extract(
+            qn, labels, scorer=fuzz.partial_token_set_ratio, score_cutoff=100, limit=None))
+    else:
+        pool = range(len(labels))
+    qt = _tokset(qn)
+    best = None
+    for i in pool:
+        score = _token_set_ratio(qn, qt, labels[i], _tokset(labels[i]))
+        if score >= min_score and (best is None or score > best[1]):
+            best = (labels[i], score)
+    return best
+
+def build_name_index(appid_to_name: Dict[str, str]) -> Dict[str, Tuple[str, FrozenSet[str]]]:
+    """appid -> (normalized name, its token set), computed once per game list."""
+    out: Dict[str, Tuple[str, FrozenSet[str]]] = {}
+    for appid, name in appid_to_name.items():
+        n = _norm(name)
+        out[appid] = (n, frozenset(n.split()))
+    return out
 
 def _find_appid_contains(appid_to_name: Dict[str, str], *substrs: str) -> Optional[str]:
     """Return appid whose normalized name contains all substrings."""
@@ -106,7 +211,8 @@ def _find_appid_contains(appid_to_name: Dict[str, str], *substrs: str) -> Option
             return appid
     return None
 
-def build_alias_index(appid_to_name: Dict[str, str]) -> Dict[str, str]:
+def build_alias_index(appid_to_name: Dict[str, str],
+                      name_index: Optional[Dict[str, Tuple[str, FrozenSet[str]]]] = None) -> Dict[str, str]:
     """
     Returns alias->appid. Includes:
     - normalized full names
@@ -114,19 +220,17 @@ def build_alias_index(appid_to_name: Dict[str, str]) -> Dict[str, str]:
     - manual aliases bound to installed targets when possible
     """
     alias: Dict[str, str] = {}
+    if name_index is None:
+        name_index = build_name_index(appid_to_name)
 
     # First pass: generate aliases from actual installed names
-    name_index: Dict[str, str] = {}  # norm_name -> appid
-    for appid, name in appid_to_name.items():
-        n = _norm(name)
-        name_index[n] = appid
+    for appid, (n, _) in name_index.items():
         alias[n] = appid
-        ac = _acronym(name)
+        ac = _acronym(n)
         if len(ac) >= 2:
             alias[ac] = appid
         # Remove edition fluff
-        base = re.sub(r"\b(remastered|definitive|enhanced|special|ultimate)\b", "", n)
-        base = re.sub(r"\s+", " ", base).strip()
+        base = _WS_RE.sub(" ", _EDITION_RE.sub("", n)).strip()
         if base and base != n:
             alias[base] = appid
 
@@ -190,9 +294,10 @@ def build_alias_index(appid_to_name: Dict[str, str]) -> Dict[str, str]:
         na = _norm(a)
         if na in alias:
             continue
+        ta = frozenset(na.split())
         best: Tuple[str, float] | None = None
-        for appid, name in appid_to_name.items():
-            score = _token_set_ratio(a, name)
+        for appid, (n, tn) in name_index.items():
+            score = _token_set_ratio(na, ta, n, tn)
             if not best or score > best[1]:
                 best = (appid, score)
         if best and best[1] >= 0.55:
@@ -200,7 +305,15 @@ def build_alias_index(appid_to_name: Dict[str, str]) -> Dict[str, str]:
 
     return alias
 
-def search_game(query: str, appid_to_name: Dict[str, str], alias_index: Dict[str, str], min_score: float = 0.58) -> Tuple[str, str, float] | None:
+def build_search_index(name_index: Dict[str, Tuple[str, FrozenSet[str]]],
+                       alias_index: Dict[str, str]) -> Dict[str, str]:
+    """Normalized label -> appid over installed names and aliases, for the fuzzy pass."""
+    out = {n: appid for appid, (n, _) in name_index.items()}
+    out.update(alias_index)  # alias keys are already normalized
+    return out
+
+def search_game(query: str, appid_to_name: Dict[str, str], alias_index: Dict[str, str], min_score: float = 0.58,
+                search_index: Optional[Dict[str, str]] = None) -> Tuple[str, str, float] | None:
     """
     Returns (appid, display_name, score) or None.
     Tries exact alias hit, then fuzzy across names and aliases.
@@ -218,29 +331,15 @@ def search_game(query: str, appid_to_name: Dict[str, str], alias_index: Dict[str
         appid = alias_index[qa]
         return appid, appid_to_name[appid], 0.95
 
-    # Fuzzy over names and aliases
-    candidates: List[Tuple[str, str]] = []  # (appid, label)
-    for appid, name in appid_to_name.items():
-        candidates.append((appid, name))
-    for al, appid in alias_index.items():
-        candidates.append((appid, al))
-
-    # Keep the best per appid
-    best_per_app: Dict[str, float] = {}
-    best_label: Dict[str, str] = {}
-    for appid, label in candidates:
-        score = _token_set_ratio(query, label)
-        if score > best_per_app.get(appid, -1.0):
-            best_per_app[appid] = score
-            best_label[appid] = appid_to_name[appid]
-
-    if not best_per_app:
+    # Fuzzy over names and aliases (rapidfuzz scores 0..100; score_cutoff prunes most candidates early)
+    if search_index is None:
+        search_index = build_search_index(build_name_index(appid_to_name), alias_index)
+    hit = _best_blend(qn, list(search_index), min_score)
+    if not hit:
         return None
-    appid_best = max(best_per_app.items(), key=lambda x: x[1])[0]
-    score_best = best_per_app[appid_best]
-    if score_best >= min_score:
-        return appid_best, best_label[appid_best], score_best
-    return None
+    label, score = hit
+    appid = search_index[label]
+    return appid, appid_to_name[appid], score
 
 # ---------- launcher ----------
 def launch_steam_game(appid: str):
@@ -250,9 +349,8 @@ def launch_steam_game(appid: str):
         subprocess.Popen(["steam", f"steam://rungameid/{appid}"])
 
 def launch_game_by_name(query: str) -> str:
-    games = get_all_installed_steam_games()
-    aliases = build_alias_index(games)
-    hit = search_game(query, games, aliases)
+    games, aliases, index = get_game_index()
+    hit = search_game(query, games, aliases, search_index=index)
     if not hit:
         return False
     appid, name, _ = hit
@@ -261,14 +359,13 @@ def launch_game_by_name(query: str) -> str:
 
 # ---------- example ----------
 if __name__ == "__main__":
-    games = get_all_installed_steam_games()
-    aliases = build_alias_index(games)
+    games, aliases, index = get_game_index()
 
     print(f"Installed games: {len(games)}")
     print("Try: cs2, counter strike, dota, gta v, skyrim se")
 
     for q in ["csgo", "cs2", "counter strike global offensive", "gta v", "rl", "skyrim se", "command and conquer", "soundpad"]:
-        hit = search_game(q, games, aliases)
+        hit = search_game(q, games, aliases, search_index=index)
         print(q, "->", hit)
 
     # launch example:
@@ -1,8 +1,8 @@
 import time
-import wave
+import queue
 import threading
+from functools import lru_cache
 import simpleaudio as audio
-from pathlib import Path
 from piper import PiperVoice
 from .facial_recognition import FaceRecognitionThread
 
@@ -23,23 +23,51 @@ GLOBAL_COOLDOWN = 10  # seconds
 
 last_fired = {}
 last_any_greeting = 0
+_last_names = None    # frozenset of names from the previous call
+_last_message = None  # build_message(_last_names)
 
 
-def _play_tts(msg):
-    Path("temp_audio").mkdir(parents=True, exist_ok=True)
-    with wave.open("temp_audio/tts.wav", "wb") as wav_file:
-        voice.synthesize_wav(msg, wav_file)
-    wave_obj = audio.WaveObject.from_wave_file("temp_audio/tts.wav")
-    play_obj = wave_obj.play()
-    play_obj.wait_done()
+_synth_lock = threading.Lock()  # the prewarm thread and a live greeting can both synthesize
+
+
+@lru_cache(maxsize=64)
+def _greeting_wave(msg):
+    # Greetings come from a handful of templates, so each is synthesized once and kept in memory.
+    # Piper's raw int16 chunks go straight into the WaveObject: no WAV encode/parse.
+    with _synth_lock:
+        pcm = b"".join(chunk.audio_int16_bytes for chunk in voice.synthesize(msg))
+    return audio.WaveObject(pcm, 1, 2, voice.config.sample_rate)
+
+
+# One long-lived speaker thread; callers only enqueue the message text
+_speech_q = queue.Queue()
+
+
+def _speaker():
+    while True:
+        msg = _speech_q.get()
+        # greetings queued while the last one played are stale; only the newest matters
+        try:
+            while True:
+                msg = _speech_q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            _greeting_wave(msg).play().wait_done()
+        except Exception as e:
+            print("Greeting playback failed:", e)
+
+
+threading.Thread(target=_speaker, daemon=True, name="greeting-speaker").start()
 
 
 def _play_tts_async(msg):
-    threading.Thread(target=_play_tts, args=(msg,), daemon=True).start()
+    _speech_q.put(msg)
 
 
+@lru_cache(maxsize=128)
 def format_names(names):
-    names = list(names)
+    """names: a tuple (hashable, so repeat groups are served from the cache)."""
     if not names:
         return ""
     if len(names) == 1:
@@ -50,11 +78,19 @@ def format_names(names):
 
 
 def build_message(current_names):
-    known = sorted(n for n in current_names if n != "unknown")
-    unknown_count = sum(1 for n in current_names if n == "unknown")
+    # one pass: split into me / unknowns / other known names
+    others = []
+    unknown_count = 0
+    has_andrew = False
+    for n in current_names:
+        if n == "unknown":
+            unknown_count += 1
+        elif n == MY_NAME:
+            has_andrew = True
+        else:
+            others.append(n)
+    others = tuple(sorted(others))
     total = len(current_names)
-    has_andrew = MY_NAME in known
-    others = [n for n in known if n != MY_NAME]
 
     if has_andrew:
         if total == 1:
@@ -70,22 +106,31 @@ def build_message(current_names):
             tail = " and ".join(parts) if parts else "welcome"
             return "andrew_with_few", f"Welcome home, {MY_NAME} — {tail}."
 
-    if known:
-        if len(known) > 3:
+    if others:
+        if len(others) > 3:
             return "known_only_many", "Welcome, everyone."
         else:
-            return "known_only_few", f"Welcome, {format_names(known)}."
+            return "known_only_few", f"Welcome, {format_names(others)}."
 
     return "generic", "Welcome."
 
 
+def _prewarm_greetings():
+    # Every message build_message can produce that doesn't spell out other known names. Names arrive
+    # deduplicated (one "unknown" at most), so only sets are prewarmed; "a".."d" stand in for any names.
+    for names in ({MY_NAME}, {MY_NAME, "unknown"}, {MY_NAME, "unknown", "a", "b"},
+                  {"unknown"}, {"a", "b", "c", "d"}):
+        _greeting_wave(build_message(frozenset(names))[1])
+
+
 def process_recognitions(recognized_faces):
-    global last_fired, last_any_greeting
-    if not recognized_faces:
+    """`recognized_faces` is the frozenset of names from a FaceRecognitionThread event."""
+    global last_fired, last_any_greeting, _last_names, _last_message
+    names_now = recognized_faces
+    if not names_now:
         return
 
     now = time.time()
-    names_now = {name for name, _ in recognized_faces}
 
     # Sliding global cooldown
     if last_any_greeting and now - last_any_greeting < GLOBAL_COOLDOWN:
@@ -94,7 +139,11 @@ def process_recognitions(recognized_faces):
     elif last_any_greeting and now - last_any_greeting >= GLOBAL_COOLDOWN:
         print(f"[DEBUG] Global cooldown over ({GLOBAL_COOLDOWN}s)")
 
-    msg_type, msg = build_message(names_now)
+    # Same faces as last time -> same message; skip rebuilding it. (Not an early return:
+    # the same people coming back after the cooldowns should still be greeted.)
+    if names_now != _last_names:
+        _last_names, _last_message = names_now, build_message(names_now)
+    msg_type, msg = _last_message
     type_cd = COOLDOWN.get(msg_type, 60)
 
     # Sliding Andrew-specific cooldown
@@ -115,7 +164,9 @@ def process_recognitions(recognized_faces):
         _play_tts_async(msg)
 
 
-def start_face_recognition(recognized_faces):
-    face_thread = FaceRecognitionThread(recognized_faces)
+def start_face_recognition(face_events):
+    # greetings can only fire once faces are coming in, so synthesize them from here rather than at import
+    threading.Thread(target=_prewarm_greetings, daemon=True).start()
+    face_thread = FaceRecognitionThread(face_events)
     face_thread.start()
     return face_thread
@@ -1,5 +1,6 @@
 # modules/maths/calculator.py
 import re, ast, operator, math
+from functools import lru_cache
 
 # ---------------- Safe evaluator ----------------
 _ops = {
@@ -12,26 +13,41 @@ _funcs = {k: getattr(math, k) for k in ("sqrt","sin","cos","tan","log","log10","
 _funcs.update({"abs": abs, "round": round})
 _consts = {"pi": math.pi, "e": math.e, "tau": math.tau}
 
+_EVAL_NS = {**_funcs, **_consts}
+
 class SafeEval(ast.NodeVisitor):
+    """Whitelist check only: raises ValueError on anything but numbers, arithmetic, _funcs calls and _consts."""
     def visit(self, node):
         if isinstance(node, ast.Expression): return self.visit(node.body)
-        if isinstance(node, ast.Num): return node.n
-        if isinstance(node, ast.Constant) and isinstance(node.value,(int,float)): return node.value
-        if isinstance(node, ast.BinOp): return _ops[type(node.op)](self.visit(node.left), self.visit(node.right))
-        if isinstance(node, ast.UnaryOp): return _ops[type(node.op)](self.visit(node.operand))
+        if isinstance(node, ast.Constant) and isinstance(node.value,(int,float)): return
+        if isinstance(node, ast.BinOp):
+            if type(node.op) not in _ops: raise ValueError("bad op")
+            self.visit(node.left); self.visit(node.right); return
+        if isinstance(node, ast.UnaryOp):
+            if type(node.op) not in _ops: raise ValueError("bad op")
+            return self.visit(node.operand)
         if isinstance(node, ast.Call):
             if not isinstance(node.func, ast.Name) or node.func.id not in _funcs: raise ValueError("bad func")
-            args = [self.visit(a) for a in node.args]
-            return _funcs[node.func.id](*args)
+            if node.keywords: raise ValueError("bad func")
+            for a in node.args: self.visit(a)
+            return
         if isinstance(node, ast.Name):
-            if node.id in _consts: return _consts[node.id]
+            if node.id in _consts: return
             raise ValueError("bad name")
-        if isinstance(node, ast.Tuple): return tuple(self.visit(e) for e in node.elts)
+        if isinstance(node, ast.Tuple):
+            for e in node.elts: self.visit(e)
+            return
         raise ValueError("bad expr")
 
-def safe_eval(expr: str) -> float:
+@lru_cache(maxsize=256)
+def _compile(expr: str):
+    # validated once, then run as bytecode; repeat questions skip parsing entirely
     tree = ast.parse(expr, mode="eval")
-    return SafeEval().visit(tree)
+    SafeEval().visit(tree)
+    return compile(tree, "<calc>", "eval")
+
+def safe_eval(expr: str) -> float:
+    return eval(_compile(expr), {"__builtins__": {}}, _EVAL_NS)
 
 # ---------------- Number words ----------------
 _units = {
@@ -55,12 +71,16 @@ _scales_plural = {k + "s": v for k, v in _scales.items()}
 _frac_words_plural = {k + "s": v for k, v in _frac_words.items()}
 _all_scales = {**_scales, **_scales_plural}
 _all_fracs = {**_frac_words, **_frac_words_plural}
+_NUM_LIT_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_WORD_HYPHEN_RE = re.compile(r"(?<=\b[a-z])-(?=[a-z]\b)")
+_DIGIT_COMMA_RE = re.compile(r"(?<=\d),(?=\d)")
+_SEP_SPLIT_RE = re.compile(r"(\W+)")
 
 def _is_num_word(w: str) -> bool:
     return (
         w in _units or w in _all_scales or w in _all_fracs
         or w in ("and","a","an","point","negative","positive")
-        or w.isdigit() or re.fullmatch(r"-?\d+(?:\.\d+)?", w) is not None
+        or w.isdigit() or _NUM_LIT_RE.fullmatch(w) is not None
     )
 
 def words_to_number(text: str) -> str:
@@ -75,10 +95,12 @@ def words_to_number(text: str) -> str:
     """
     s = text.lower()
     # split only word-word hyphens; keep numeric negatives
-    s = re.sub(r"(?<=\b[a-z])-(?=[a-z]\b)", " ", s)
-    s = re.sub(r"(?<=\d),(?=\d)", "", s)  # remove digit group commas
+    s = _WORD_HYPHEN_RE.sub(" ", s)
+    s = _DIGIT_COMMA_RE.sub("", s)  # remove digit group commas
 
-    tokens = re.split(r"(\W+)", s)  # keep separators
+    # keep separators; with one capture group, split() puts every \W+ run at an odd
+    # index and the (possibly empty) words between them at even ones
+    tokens = _SEP_SPLIT_RE.split(s)
     out = []
     total = 0
     current = 0
@@ -109,7 +131,7 @@ def words_to_number(text: str) -> str:
     i = 0
     while i < len(tokens):
         tok = tokens[i]
-        if re.fullmatch(r"\W+", tok):
+        if i % 2:
             # spaces: keep; punctuation: boundary
             if tok.isspace():
                 out.append(tok); i += 1; continue
@@ -121,19 +143,17 @@ def words_to_number(text: str) -> str:
 
         # sign words starting a number phrase
         if w == "negative" and not in_number:
-            j = i + 1
-            while j < len(tokens) and re.fullmatch(r"\W+", tokens[j]): j += 1
+            j = i + 2  # next word, past the separator
             if j < len(tokens) and _is_num_word(tokens[j].strip().lower()):
                 neg_pending = True; in_number = True; i += 1; continue
 
         if w == "positive" and not in_number:
-            j = i + 1
-            while j < len(tokens) and re.fullmatch(r"\W+", tokens[j]): j += 1
+            j = i + 2  # next word, past the separator
             if j < len(tokens) and _is_num_word(tokens[j].strip().lower()):
                 neg_pending = False; in_number = True; i += 1; continue
 
         # direct numeric token
-        if re.fullmatch(r"-?\d+(?:\.\d+)?", w):
+        if _NUM_LIT_RE.fullmatch(w):
             val = float(w)
             if not in_number:
                 in_number = True
@@ -167,8 +187,7 @@ def words_to_number(text: str) -> str:
 
         # articles inside number phrase
         if w in ("a","an"):
-            j = i + 1
-            while j < len(tokens) and re.fullmatch(r"\W+", tokens[j]): j += 1
+            j = i + 2  # next word, past the separator
             nxt = tokens[j].strip().lower() if j < len(tokens) else ""
             if nxt in _all_fracs:
                 if not in_number: in_number = True
@@ -187,7 +206,7 @@ def words_to_number(text: str) -> str:
             j = i + 1
             while j < len(tokens):
                 t = tokens[j]
-                if re.fullmatch(r"\W+", t): j += 1; continue
+                if j % 2: j += 1; continue
                 ww = t.strip().lower()
                 if ww in _units: dec_digits.append(str(_units[ww])); j += 1; continue
                 if ww.isdigit(): dec_digits.append(ww); j += 1; continue
@@ -275,6 +294,15 @@ _replacements = [
     (r"\bpercent\b", "%"),
 ]
 
+_PRE_REWRITES = [(re.compile(p, re.I), r) for p, r in _pre_rewrites]
+_REPLACEMENTS = [(re.compile(p, re.I), r) for p, r in _replacements]
+_SQRT_OPEN_RE = re.compile(r"sqrt\(([^()]+)(?!\))")
+_PERCENT_OF_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*of\s*(\d+(?:\.\d+)?)")
+_PERCENT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+_UNARY_NEG_RE = re.compile(r"(?:(?<=^)|(?<=[\(\+\-\*/%]))\s*negative\s+(\d+(?:\.\d+)?)", re.I)
+_SPACES_RE = re.compile(r"\s+")
+_DISALLOWED_RE = re.compile(r"[^\d\.\+\-\*/%\(\)\s,\^A-Za-z_]")
+
 # ---------------- Filler stripping + windowing ----------------
 # Strip lead prompts; not critical, windowing handles "extra words before math".
 _LEAD_STRIP_SEQ = re.compile(
@@ -289,6 +317,7 @@ _LEAD_STRIP_SEQ = re.compile(
 )
 _TRAIL_TRASH_RE = re.compile(r"[?=\s]+$")
 _MATH_CHUNK_RE = re.compile(r"[0-9a-z\.\(\)\+\-\*/%\s\^]+")
+_SPAN_GAP_RE = re.compile(r"[\s,]+")
 
 # window finder for math-y span inside noisy sentences
 _WORD_NUM_PATTERN = (
@@ -326,8 +355,7 @@ def _extract_best_math_window(text: str) -> str | None:
     start = matches[0].start()
     end = matches[0].end()
     for m in matches[1:]:
-        gap = text[end:m.start()]
-        if re.fullmatch(r"[\s,]+", gap or ""):
+        if _SPAN_GAP_RE.fullmatch(text, end, m.start()):  # test the gap in place, no slice
             end = m.end()
         else:
             spans.append((start, end))
@@ -346,25 +374,25 @@ def _preclean(text: str) -> str:
     return s
 
 def _apply_pre_rewrites(s: str) -> str:
-    for pat, rep in _pre_rewrites:
-        s = re.sub(pat, rep, s, flags=re.I)
+    for cre, rep in _PRE_REWRITES:
+        s = cre.sub(rep, s)
     return s
 
 def _apply_word_operators(s: str) -> str:
-    for pat, rep in _replacements:
-        s = re.sub(pat, rep, s, flags=re.I)
+    for cre, rep in _REPLACEMENTS:
+        s = cre.sub(rep, s)
     return s
 
 def _close_functions(s: str) -> str:
-    return re.sub(r"sqrt\(([^()]+)(?!\))", r"sqrt(\1)", s)
+    return _SQRT_OPEN_RE.sub(r"sqrt(\1)", s)
 
 def _apply_percent_rules(s: str) -> str:
-    s = re.sub(r"(\d+(?:\.\d+)?)\s*%\s*of\s*(\d+(?:\.\d+)?)", r"(\1/100)*(\2)", s)
-    s = re.sub(r"(\d+(?:\.\d+)?)\s*%", r"(\1/100)", s)
+    s = _PERCENT_OF_RE.sub(r"(\1/100)*(\2)", s)
+    s = _PERCENT_RE.sub(r"(\1/100)", s)
     return s
 
 def _apply_unary_negatives(s: str) -> str:
-    return re.sub(r"(?:(?<=^)|(?<=[\(\+\-\*/%]))\s*negative\s+(\d+(?:\.\d+)?)", r"-\1", s, flags=re.I)
+    return _UNARY_NEG_RE.sub(r"-\1", s)
 
 def normalize_math(text: str) -> str:
     s = _preclean(text)
@@ -376,9 +404,9 @@ def normalize_math(text: str) -> str:
     s = _apply_unary_negatives(s)
     s = _close_functions(_apply_percent_rules(s))
     s = s.replace("^", "**")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _SPACES_RE.sub(" ", s).strip()
     # allow digits, ops, parens, whitespace, comma, caret, letters (funcs/consts)
-    if re.search(r"[^\d\.\+\-\*/%\(\)\s,\^A-Za-z_]", s):
+    if _DISALLOWED_RE.search(s):
         raise ValueError("disallowed characters")
     return s
 
@@ -1,21 +1,73 @@
-import json, os, time
+import colorsys, json, os, pickle, threading, time
 import re
 from pathlib import Path
+from concurrent.futures import Future
+from functools import lru_cache
 from typing import Any, Dict, Optional, Tuple
 import tinytuya
 
+try:
+    import orjson  # optional, much faster parse
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+def _read_json(path: Path) -> Any:
+    return _loads(path.read_bytes())
+
 _SWITCH_CODES = ("switch", "switch_led", "switch_1", "led_switch", "switch_main")
+_BRIGHT_CODES = ("bright_value_v2", "bright_value", "brightness")
+_COLOUR_CODES = ("colour_data_v2", "color_data_v2", "colour_data", "color_data")
+
+def _dp_scale(mapping: Dict[str, Any], dp: Optional[int]) -> Optional[Tuple[int, float]]:
+    """(min, 1/range) of an Integer DP's raw values, or None if it has no usable range."""
+    if not dp:
+        return None
+    meta = mapping.get(str(dp), {}).get("values", {})
+    try:
+        dmin = int(meta.get("min", 0)); dmax = int(meta.get("max", 1000)) or 1000
+    except (TypeError, ValueError):
+        return None
+    return dmin, 1.0 / max(1, dmax - dmin)
+
+@lru_cache(maxsize=None)
+def _code_set(codes: Tuple[str, ...]) -> frozenset:
+    return frozenset(codes)
+
+def _match_dp(mapping: Dict[str, Any], codes: Tuple[str, ...]) -> Optional[int]:
+    """DP number for the first mapping entry whose code is in codes, then one that starts with one, then a Boolean DP 1/20."""
+    exact = _code_set(codes)
+    prefix = None
+    # one pass: an exact match returns at once, the first prefix match is held in case none turns up
+    for k, meta in mapping.items():
+        code = (meta.get("code") or "").lower()
+        is_exact = code in exact
+        if is_exact or (prefix is None and code.startswith(codes)):
+            try: dp = int(k)
+            except ValueError: continue
+            if is_exact:
+                return dp
+            prefix = dp
+    if prefix is not None:
+        return prefix
+    for guess in (1, 20):
+        m = mapping.get(str(guess))
+        if isinstance(m, dict) and m.get("type") == "Boolean":
+            return guess
+    return None
 
 # -------------------- File and Device Loading -------------------
 
+# Where devices.json / snapshot.json may live, in priority order; worked out once at import
+_HERE = Path(__file__).resolve()
+_SEARCH_DIRS = tuple(dict.fromkeys(
+    ([Path(os.environ["SMART_DEVICES_DIR"])] if os.getenv("SMART_DEVICES_DIR") else [])
+    + [Path.cwd(), _HERE.parent, _HERE.parent.parent, _HERE.parents[2]]
+))
+
+@lru_cache(maxsize=None)
 def _find_file(fname: str) -> Optional[Path]:
-    env = os.getenv("SMART_DEVICES_DIR")
-    if env:
-        p = Path(env) / fname
-        if p.exists():
-            return p
-    here = Path(__file__).resolve()
-    for base in [Path.cwd(), here.parent, here.parent.parent, here.parents[2]]:
+    for base in _SEARCH_DIRS:
         p = base / fname
         if p.exists():
             return p
@@ -27,37 +79,84 @@ SNAPSHOT_JSON = _find_file("snapshot.json")
 if not DEVICES_JSON:
     raise FileNotFoundError("devices.json not found. Set SMART_DEVICES_DIR or place it in project root.")
 
-with DEVICES_JSON.open("r", encoding="utf-8") as f:
-    DEVICES = json.load(f)
-
-_SNAPSHOT = {}
-if SNAPSHOT_JSON and SNAPSHOT_JSON.exists():
-    snap = json.load(SNAPSHOT_JSON.open("r", encoding="utf-8"))
-    for d in snap.get("devices", []):
-        if d.get("id"):
-            _SNAPSHOT[d["id"]] = {"ip": d.get("ip"), "ver": d.get("ver") or d.get("version") or "3.3"}
-
-_DEVICES_BY_ID: Dict[str, Dict[str, Any]] = {}
-_DEVICES_BY_NAME: Dict[str, Dict[str, Any]] = {}
-for d in DEVICES:
-    name = d.get("name", "").strip()
-    did = d.get("id")
-    if not did:
-        continue
-    entry = {
-        "name": name,
-        "id": did,
-        "key": d.get("key"),
-        "ip": d.get("ip"),
-        "ver": d.get("version") or "3.3",
-        "mapping": d.get("mapping", {}),
-    }
-    _DEVICES_BY_ID[did] = entry
-    if name:
-        _DEVICES_BY_NAME[name.lower()] = entry
+# Parsed + indexed devices are pickled next to devices.json and reused until either JSON file changes
+_INDEX_CACHE = DEVICES_JSON.with_suffix(".idx.pkl")
+_INDEX_VERSION = 4  # bump whenever the entry layout changes so old pickles are rebuilt
+
+def _json_stamp() -> Tuple[int, int, Optional[int]]:
+    snap_mtime = SNAPSHOT_JSON.stat().st_mtime_ns if SNAPSHOT_JSON and SNAPSHOT_JSON.exists() else None
+    return _INDEX_VERSION, DEVICES_JSON.stat().st_mtime_ns, snap_mtime
+
+def _load_snapshot() -> Dict[str, Dict[str, Any]]:
+    out = {}
+    if SNAPSHOT_JSON and SNAPSHOT_JSON.exists():
+        snap = _read_json(SNAPSHOT_JSON)
+        for d in snap.get("devices", []):
+            if d.get("id"):
+                out[d["id"]] = {"ip": d.get("ip"), "ver": d.get("ver") or d.get("version") or "3.3"}
+    return out
+
+def _index_devices() -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    devices = _read_json(DEVICES_JSON)
+    by_id: Dict[str, Dict[str, Any]] = {}
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for d in devices:
+        name = d.get("name", "").strip()
+        did = d.get("id")
+        if not did:
+            continue
+        entry = {
+            "name": name,
+            "id": did,
+            "key": d.get("key"),
+            "ip": d.get("ip"),
+            "ver": d.get("version") or "3.3",
+            "mapping": d.get("mapping", {}),
+        }
+        # resolve the DPs the light_* calls need once, instead of scanning the mapping per call
+        mapping = entry["mapping"]
+        entry["dp_switch"] = _match_dp(mapping, _SWITCH_CODES)
+        entry["dp_brightness"] = _match_dp(mapping, _BRIGHT_CODES)
+        entry["bright_scale"] = _dp_scale(mapping, entry["dp_brightness"])
+        # status() keys DPS by string, so keep the keys ready rather than str()-ing per read
+        entry["dp_switch_s"] = str(entry["dp_switch"]) if entry["dp_switch"] else None
+        entry["dp_brightness_s"] = str(entry["dp_brightness"]) if entry["dp_brightness"] else None
+        entry["dp_colour_s"] = tuple(dict.fromkeys(
+            str(dp) for dp in (_match_dp(mapping, (c,)) for c in _COLOUR_CODES) if dp))
+        by_id[did] = entry
+        if name:
+            by_name[name.lower()] = entry
+    return by_id, by_name
+
+def _load_index():
+    """(by_id, by_name, snapshot), from the pickle when it matches the JSON files, else rebuilt and re-cached."""
+    stamp = _json_stamp()
+    try:
+        with _INDEX_CACHE.open("rb") as f:
+            cached = pickle.load(f)
+        if cached["stamp"] == stamp:
+            return cached["by_id"], cached["by_name"], cached["snapshot"]
+    except Exception:
+        pass  # missing, stale or corrupt cache: rebuild from JSON
+    by_id, by_name = _index_devices()
+    snapshot = _load_snapshot()
+    try:
+        tmp = _INDEX_CACHE.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump({"stamp": stamp, "by_id": by_id, "by_name": by_name, "snapshot": snapshot},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, _INDEX_CACHE)
+    except OSError:
+        pass
+    return by_id, by_name, snapshot
+
+_DEVICES_BY_ID, _DEVICES_BY_NAME, _SNAPSHOT = _load_index()
 
 # -------------------- Device Resolution --------------------
 
+# The index is fixed once loaded, so each name/id resolves the same way for the life of the process
+# (failures raise and are not cached, so a device that later gains an IP is picked up)
+@lru_cache(maxsize=256)
 def _resolve_device(name_or_id: str) -> Dict[str, Any]:
     dev = _DEVICES_BY_NAME.get(name_or_id.lower()) or _DEVICES_BY_ID.get(name_or_id)
     if not dev:
@@ -71,95 +170,314 @@ def _resolve_device(name_or_id: str) -> Dict[str, Any]:
         raise RuntimeError(f"Device '{dev['name']}' has no IP. Run 'python -m tinytuya scan'.")
     return dev
 
+# One BulbDevice per device id, kept for the life of the process so its socket and session are reused.
+# Every thread shares it, so each round trip holds that device's IO lock: frames on one socket must not interleave.
+_BULB_CACHE: Dict[str, tinytuya.BulbDevice] = {}
+_BULB_IO_LOCKS: Dict[str, threading.Lock] = {}
+_BULB_LOCK = threading.Lock()
+
 def _bulb(dev: Dict[str, Any]) -> tinytuya.BulbDevice:
-    b = tinytuya.BulbDevice(dev["id"], dev["ip"], dev["key"])
-    try:
-        b.set_version(float(dev.get("ver", 3.3)))
-    except Exception:
-        b.set_version(3.3)
+    b = _BULB_CACHE.get(dev["id"])
+    if b is not None:
+        return b
+    with _BULB_LOCK:
+        b = _BULB_CACHE.get(dev["id"])
+        if b is None:
+            b = tinytuya.BulbDevice(dev["id"], dev["ip"], dev["key"])
+            try:
+                b.set_version(float(dev.get("ver", 3.3)))
+            except Exception:
+                b.set_version(3.3)
+            b.set_socketPersistent(True)
+            _BULB_IO_LOCKS[dev["id"]] = threading.Lock()
+            _BULB_CACHE[dev["id"]] = b
     return b
 
-def _dp_for(dev: Dict[str, Any], codes: Tuple[str, ...]) -> Optional[int]:
-    for k, meta in dev.get("mapping", {}).items():
-        code = (meta.get("code") or "").lower()
-        if code in codes:
-            try: return int(k)
-            except: continue
-    for k, meta in dev.get("mapping", {}).items():
-        code = (meta.get("code") or "").lower()
-        if any(code.startswith(c) for c in codes):
-            try: return int(k)
-            except: continue
-    for guess in (1, 20):
-        m = dev.get("mapping", {}).get(str(guess))
-        if isinstance(m, dict) and m.get("type") == "Boolean":
-            return guess
-    return None
+def _io_lock(dev: Dict[str, Any]) -> threading.Lock:
+    _bulb(dev)  # the lock is created alongside the device
+    return _BULB_IO_LOCKS[dev["id"]]
+
+def _read_state(dev: Dict[str, Any]) -> Dict[str, Any]:
+    with _io_lock(dev):
+        return _bulb(dev).state()
+
+# Known DPS per device: (stamp, dps, full). Full entries come from status(); our own writes
+# patch them, or start a partial one holding just the DPs we wrote. Trusted for STATE_TTL seconds.
+STATE_TTL = 2.0
+_STATE_CACHE: Dict[str, Tuple[float, Dict[str, Any], bool]] = {}
+_UNKNOWN = object()
+
+def _fresh(dev: Dict[str, Any]):
+    hit = _STATE_CACHE.get(dev["id"])
+    return hit if hit and time.monotonic() - hit[0] < STATE_TTL else None
+
+def _cached_dp(dev: Dict[str, Any], key: str) -> Any:
+    """Last known value of one DP, or _UNKNOWN without a network read."""
+    hit = _fresh(dev)
+    return hit[1].get(key, _UNKNOWN) if hit else _UNKNOWN
+
+def _device_status(dev: Dict[str, Any]) -> Dict[str, Any]:
+    """Current DPS of dev, from the cache while a full read is fresh (treat as read-only)."""
+    hit = _fresh(dev)
+    if hit and hit[2]:
+        return hit[1]
+    with _io_lock(dev):
+        dps = _bulb(dev).status().get("dps")
+    if not dps:
+        return {}
+    _STATE_CACHE[dev["id"]] = (time.monotonic(), dps, True)
+    return dps
+
+def _failed(res: Any) -> bool:
+    # tinytuya reports network/device errors by returning {"Error": ..., "Err": ...}, not by raising
+    return isinstance(res, dict) and "Error" in res
+
+def _note_write(dev: Dict[str, Any], method: str, args: Tuple[Any, ...], ok: bool) -> None:
+    if not ok:
+        _STATE_CACHE.pop(dev["id"], None)  # a failed write leaves state unknown
+        return
+    hit = _fresh(dev)
+    if method == "set_value":
+        if hit:
+            hit[1][str(args[0])] = args[1]
+        else:
+            _STATE_CACHE[dev["id"]] = (time.monotonic(), {str(args[0]): args[1]}, False)
+        return
+    # colour/white/brightness writes touch several DPs; only the switch state survives them
+    sw = dev["dp_switch_s"]
+    if hit and sw in hit[1]:
+        _STATE_CACHE[dev["id"]] = (hit[0], {sw: hit[1][sw]}, False)
+    else:
+        _STATE_CACHE.pop(dev["id"], None)
 
+# Identical writes to the same device that overlap share one round trip (slider drags, repeated events)
+_INFLIGHT: Dict[Tuple[Any, ...], Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+def _call(dev: Dict[str, Any], method: str, args: Tuple[Any, ...]):
+    try:
+        with _io_lock(dev):
+            res = getattr(_bulb(dev), method)(*args)
+    except BaseException:
+        _note_write(dev, method, args, ok=False)
+        raise
+    _note_write(dev, method, args, ok=not _failed(res))
+    return res
+
+def _send(dev: Dict[str, Any], method: str, *args):
+    """bulb.<method>(*args), or the result of an identical call already in flight for this device."""
+    if method == "set_value" and _cached_dp(dev, str(args[0])) == args[1]:
+        return None  # already in that state
+    key = (dev["id"], method) + args
+    with _INFLIGHT_LOCK:
+        fut = _INFLIGHT.get(key)
+        leader = fut is None
+        if leader:
+            fut = _INFLIGHT[key] = Future()
+    if not leader:
+        res = fut.result()
+        # the shared attempt failed: make our own rather than pass its error off as our result
+        return _call(dev, method, args) if _failed(res) else res
+    try:
+        res = _call(dev, method, args)
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    else:
+        fut.set_result(res)
+        return res
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[key]
 
 # -------------------- Light State Controls --------------------
 
 def light_on(name_or_id: str):
     dev = _resolve_device(name_or_id)
-    dp = _dp_for(dev, _SWITCH_CODES)
+    dp = dev["dp_switch"]
     if dp is None: 
         raise RuntimeError(f"No switch DP for '{dev['name']}'")
-    return _bulb(dev).set_value(dp, True)
+    return _send(dev, "set_value", dp, True)
 
 def light_off(name_or_id: str):
     dev = _resolve_device(name_or_id)
-    dp = _dp_for(dev, _SWITCH_CODES)
+    dp = dev["dp_switch"]
     if dp is None: 
         raise RuntimeError(f"No switch DP for '{dev['name']}'")
-    return _bulb(dev).set_value(dp, False)
+    return _send(dev, "set_value", dp, False)
 
 def light_toggle(name_or_id: str):
     dev = _resolve_device(name_or_id)
-    dp = _dp_for(dev, _SWITCH_CODES)
+    dp = dev["dp_switch"]
     if dp is None: 
         raise RuntimeError(f"No switch DP for '{dev['name']}'")
-    bulb = _bulb(dev)
-    state = bulb.status().get("dps", {}).get(str(dp), False)
-    return bulb.set_value(dp, not state)
+    state = _cached_dp(dev, dev["dp_switch_s"])
+    if state is _UNKNOWN:
+        state = _device_status(dev).get(dev["dp_switch_s"], False)
+    return _send(dev, "set_value", dp, not state)
 
 
 # -------------------- Color and Temperature --------------------
 
+# Built once at import; light_color/_parse_color_input only look names up
+_WHITE_PRESETS = {
+    "white": 50,
+    "warm": 15,
+    "warm white": 20,
+    "soft white": 30,
+    "neutral": 50,
+    "cool": 80,
+    "cool white": 85,
+    "cold": 100,
+    "candlelight": 0,
+    "candle light": 0,
+    "candle": 0,
+    "daylight": 0,
+    "day light": 0,
+    "day": 0,
+    "ivory": 100,
+    "ivory white": 100,
+    "amber": 10,
+    "gold": 12,
+    "sunset": 8,
+    "sunrise": 12,
+    "halogen": 25,
+    "natural": 55,
+    "pure white": 60,
+    "bright white": 70,
+    "arctic white": 95,
+}
+
+_NAMED_COLORS = {
+    # Base
+    "red": (255, 0, 0),
+    "green": (0, 255, 0),
+    "blue": (0, 0, 255),
+    "yellow": (255, 255, 0),
+    "purple": (128, 0, 128),
+    "pink": (255, 105, 180),
+    "orange": (255, 165, 0),
+    "cyan": (0, 255, 255),
+    "magenta": (255, 0, 255),
+    "turquoise": (64, 224, 208),
+
+    # Extended basics
+    "lime": (191, 255, 0),
+    "teal": (0, 128, 128),
+    "violet": (238, 130, 238),
+    "indigo": (75, 0, 130),
+    "maroon": (128, 0, 0),
+    "navy": (0, 0, 128),
+    "olive": (128, 128, 0),
+    "aqua": (0, 255, 255),
+    "coral": (255, 127, 80),
+    "crimson": (220, 20, 60),
+    "lavender": (230, 230, 250),
+    "mint": (189, 252, 201),
+    "peach": (255, 218, 185),
+    "plum": (221, 160, 221),
+    "rose": (255, 228, 225),
+    "salmon": (250, 128, 114),
+    "scarlet": (255, 36, 0),
+    "tan": (210, 180, 140),
+    "beige": (245, 245, 220),
+    "burgundy": (128, 0, 32),
+    "emerald": (80, 200, 120),
+    "gold": (255, 215, 0),
+    "silver": (192, 192, 192),
+    "bronze": (205, 127, 50),
+    "charcoal": (54, 69, 79),
+    "chocolate": (210, 105, 30),
+    "brown": (165, 42, 42),
+    "black": (0, 0, 0),
+    "white": (255, 255, 255),
+    "gray": (128, 128, 128),
+    "grey": (128, 128, 128),
+
+    # Pastels
+    "baby blue": (137, 207, 240),
+    "baby pink": (244, 194, 194),
+    "powder blue": (176, 224, 230),
+    "mint green": (152, 255, 152),
+    "pastel yellow": (253, 253, 150),
+    "pastel pink": (255, 209, 220),
+    "pastel purple": (179, 158, 181),
+    "pastel orange": (255, 179, 71),
+    "pastel green": (119, 221, 119),
+    "pastel blue": (174, 198, 207),
+    "pastel red": (255, 105, 97),
+
+    # Neons
+    "neon green": (57, 255, 20),
+    "neon blue": (77, 77, 255),
+    "neon pink": (255, 20, 147),
+    "neon yellow": (207, 255, 4),
+    "neon orange": (255, 95, 31),
+    "neon purple": (177, 13, 201),
+
+    # Warm tones
+    "amber": (255, 191, 0),
+    "apricot": (251, 206, 177),
+    "copper": (184, 115, 51),
+    "mustard": (255, 219, 88),
+    "ochre": (204, 119, 34),
+    "russet": (128, 70, 27),
+    "rust": (183, 65, 14),
+    "saffron": (244, 196, 48),
+    "sepia": (112, 66, 20),
+
+    # Cool tones
+    "aquamarine": (127, 255, 212),
+    "azure": (0, 127, 255),
+    "cobalt": (0, 71, 171),
+    "cerulean": (42, 82, 190),
+    "seafoam": (159, 226, 191),
+    "sky blue": (135, 206, 235),
+    "steel blue": (70, 130, 180),
+
+    # Earth tones
+    "khaki": (240, 230, 140),
+    "sand": (194, 178, 128),
+    "mahogany": (192, 64, 0),
+    "mocha": (150, 75, 0),
+    "coffee": (111, 78, 55),
+    "walnut": (119, 63, 26),
+    "forest green": (34, 139, 34),
+    "hunter green": (53, 94, 59),
+
+    # Miscellaneous
+    "fuchsia": (255, 0, 255),
+    "chartreuse": (127, 255, 0),
+    "periwinkle": (204, 204, 255),
+    "blush": (222, 93, 131),
+    "ivory": (255, 255, 240),
+    "cream": (255, 253, 208),
+    "off white": (253, 253, 250),
+    "pearl": (234, 224, 200),
+    "smoke": (115, 130, 118),
+    "slate": (112, 128, 144),
+    "gunmetal": (42, 52, 57),
+    "midnight blue": (25, 25, 112),
+    "midnight": (25, 25, 112),
+    "obsidian": (15, 15, 15)
+}
+
+# Hue/saturation of every named colour, so light_color skips the RGB -> HSV conversion for them
+_NAMED_HS = {name: colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)[:2]
+             for name, (r, g, b) in _NAMED_COLORS.items()}
+
 def light_color(name_or_id: str, color: Any):
     dev = _resolve_device(name_or_id)
     bulb = _bulb(dev)
     light_on(name_or_id)
 
-    white_presets = {
-        "white": 50,
-        "warm": 15,
-        "warm white": 20,
-        "soft white": 30,
-        "neutral": 50,
-        "cool": 80,
-        "cool white": 85,
-        "cold": 100,
-        "candlelight": 0,
-        "candle light": 0,
-        "candle": 0,
-        "daylight": 0,
-        "day light": 0,
-        "day": 0,
-        "ivory": 100,
-        "ivory white": 100,
-        "amber": 10,
-        "gold": 12,
-        "sunset": 8,
-        "sunrise": 12,
-        "halogen": 25,
-        "natural": 55,
-        "pure white": 60,
-        "bright white": 70,
-        "arctic white": 95,
-    }
-
-    if isinstance(color, str) and color.strip().lower() in white_presets:
-        _set_white_temp(dev, bulb, white_presets[color.strip().lower()])
+    key = color.strip().lower() if isinstance(color, str) else None
+    if key in _WHITE_PRESETS:
+        _set_white_temp(dev, bulb, _WHITE_PRESETS[key])
+        return
+    if key in _NAMED_HS:
+        h, s = _NAMED_HS[key]
+        _apply_hs(dev, bulb, h, s)
         return
 
     r, g, b = _parse_color_input(color)
@@ -173,7 +491,7 @@ def _set_white_temp(dev: Dict[str, Any], bulb, pct: int):
     # read current brightness from whichever mode we are in
     v_pct = None
     try:
-        st = bulb.state()
+        st = _read_state(dev)
         if isinstance(st, dict) and "Error" not in st:
             mode = str(bulb.get_mode(state=st)).lower()
             if mode in ("colour", "color"):
@@ -188,141 +506,32 @@ def _set_white_temp(dev: Dict[str, Any], bulb, pct: int):
         v_pct = 100  # sensible default
 
     # library handles switching to white + applies brightness and colour temp as percentages
-    return bulb.set_white_percentage(brightness=v_pct, colourtemp=pct)
+    return _send(dev, "set_white_percentage", v_pct, pct)
 
 
 def _parse_color_input(c: Any) -> Tuple[int, int, int]:
-    named = {
-        # Base
-        "red": (255, 0, 0),
-        "green": (0, 255, 0),
-        "blue": (0, 0, 255),
-        "yellow": (255, 255, 0),
-        "purple": (128, 0, 128),
-        "pink": (255, 105, 180),
-        "orange": (255, 165, 0),
-        "cyan": (0, 255, 255),
-        "magenta": (255, 0, 255),
-        "turquoise": (64, 224, 208),
-
-        # Extended basics
-        "lime": (191, 255, 0),
-        "teal": (0, 128, 128),
-        "violet": (238, 130, 238),
-        "indigo": (75, 0, 130),
-        "maroon": (128, 0, 0),
-        "navy": (0, 0, 128),
-        "olive": (128, 128, 0),
-        "aqua": (0, 255, 255),
-        "coral": (255, 127, 80),
-        "crimson": (220, 20, 60),
-        "lavender": (230, 230, 250),
-        "mint": (189, 252, 201),
-        "peach": (255, 218, 185),
-        "plum": (221, 160, 221),
-        "rose": (255, 228, 225),
-        "salmon": (250, 128, 114),
-        "scarlet": (255, 36, 0),
-        "tan": (210, 180, 140),
-        "beige": (245, 245, 220),
-        "burgundy": (128, 0, 32),
-        "emerald": (80, 200, 120),
-        "gold": (255, 215, 0),
-        "silver": (192, 192, 192),
-        "bronze": (205, 127, 50),
-        "charcoal": (54, 69, 79),
-        "chocolate": (210, 105, 30),
-        "brown": (165, 42, 42),
-        "black": (0, 0, 0),
-        "white": (255, 255, 255),
-        "gray": (128, 128, 128),
-        "grey": (128, 128, 128),
-
-        # Pastels
-        "baby blue": (137, 207, 240),
-        "baby pink": (244, 194, 194),
-        "powder blue": (176, 224, 230),
-        "mint green": (152, 255, 152),
-        "pastel yellow": (253, 253, 150),
-        "pastel pink": (255, 209, 220),
-        "pastel purple": (179, 158, 181),
-        "pastel orange": (255, 179, 71),
-        "pastel green": (119, 221, 119),
-        "pastel blue": (174, 198, 207),
-        "pastel red": (255, 105, 97),
-
-        # Neons
-        "neon green": (57, 255, 20),
-        "neon blue": (77, 77, 255),
-        "neon pink": (255, 20, 147),
-        "neon yellow": (207, 255, 4),
-        "neon orange": (255, 95, 31),
-        "neon purple": (177, 13, 201),
-
-        # Warm tones
-        "amber": (255, 191, 0),
-        "apricot": (251, 206, 177),
-        "copper": (184, 115, 51),
-        "mustard": (255, 219, 88),
-        "ochre": (204, 119, 34),
-        "russet": (128, 70, 27),
-        "rust": (183, 65, 14),
-        "saffron": (244, 196, 48),
-        "sepia": (112, 66, 20),
-
-        # Cool tones
-        "aquamarine": (127, 255, 212),
-        "azure": (0, 127, 255),
-        "cobalt": (0, 71, 171),
-        "cerulean": (42, 82, 190),
-        "seafoam": (159, 226, 191),
-        "sky blue": (135, 206, 235),
-        "steel blue": (70, 130, 180),
-
-        # Earth tones
-        "khaki": (240, 230, 140),
-        "sand": (194, 178, 128),
-        "mahogany": (192, 64, 0),
-        "mocha": (150, 75, 0),
-        "coffee": (111, 78, 55),
-        "walnut": (119, 63, 26),
-        "forest green": (34, 139, 34),
-        "hunter green": (53, 94, 59),
-
-        # Miscellaneous
-        "fuchsia": (255, 0, 255),
-        "chartreuse": (127, 255, 0),
-        "periwinkle": (204, 204, 255),
-        "blush": (222, 93, 131),
-        "ivory": (255, 255, 240),
-        "cream": (255, 253, 208),
-        "off white": (253, 253, 250),
-        "pearl": (234, 224, 200),
-        "smoke": (115, 130, 118),
-        "slate": (112, 128, 144),
-        "gunmetal": (42, 52, 57),
-        "midnight blue": (25, 25, 112),
-        "midnight": (25, 25, 112),
-        "obsidian": (15, 15, 15)
-    }
-
     if isinstance(c, str):
-        s = c.strip().lower()
-        if s in named:
-            return named[s]
-        if s.startswith("#") and len(s) in (7, 4):
-            if len(s) == 7:
-                return int(s[1:3], 16), int(s[3:5], 16), int(s[5:7], 16)
-            return int(s[1]*2, 16), int(s[2]*2, 16), int(s[3]*2, 16)
-        raise ValueError(f"Unsupported color '{c}'")
+        return _parse_color_str(c)
     if isinstance(c, (tuple, list)) and len(c) == 3:
         return tuple(max(0, min(255, int(v))) for v in c)
     raise ValueError(f"Unsupported color '{c}'")
 
-def _read_current_hsv(dev: Dict[str, Any], bulb: tinytuya.BulbDevice) -> Optional[Tuple[float, float, float]]:
-    """Return current (h,s,v) in 0..1, or None if unavailable."""
+@lru_cache(maxsize=256)
+def _parse_color_str(c: str) -> Tuple[int, int, int]:
+    s = c.strip().lower()
+    if s in _NAMED_COLORS:
+        return _NAMED_COLORS[s]
+    if s.startswith("#") and len(s) in (7, 4):
+        # one C-level fromhex is quicker than per-channel int(.., 16) or a 256-entry lookup table
+        t = bytes.fromhex(s[1:] if len(s) == 7 else s[1]*2 + s[2]*2 + s[3]*2)
+        return t[0], t[1], t[2]
+    raise ValueError(f"Unsupported color '{c}'")
+
+def _read_current_hsv(dev: Dict[str, Any], bulb: tinytuya.BulbDevice, st: Optional[dict] = None) -> Optional[Tuple[float, float, float]]:
+    """Return current (h,s,v) in 0..1, or None if unavailable. Pass `st` to reuse a state read already made."""
     try:
-        st = bulb.state()
+        if st is None:
+            st = _read_state(dev)
         if isinstance(st, dict) and "Error" not in st:
             h, s, v = bulb.colour_hsv(state=st)
             return float(h), float(s), float(v)
@@ -330,7 +539,7 @@ def _read_current_hsv(dev: Dict[str, Any], bulb: tinytuya.BulbDevice) -> Optiona
         pass
     # Fallback via raw DPS "colour" if state() path failed
     try:
-        dps = bulb.status().get("dps", {}) or {}
+        dps = _device_status(dev)
         dp_colour = getattr(bulb, "dpset", {}).get("colour")
         if dp_colour and dp_colour in dps and isinstance(dps[dp_colour], str):
             h, s, v = tinytuya.BulbDevice.hexvalue_to_hsv(dps[dp_colour], getattr(bulb, "dpset", {}).get("value_hexformat"))
@@ -339,10 +548,13 @@ def _read_current_hsv(dev: Dict[str, Any], bulb: tinytuya.BulbDevice) -> Optiona
         pass
     return None
 
+# "h,s,v" colour DP payloads some older firmware reports
+_HSV_CSV_RE = re.compile(r"^\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*$")
+
 def _read_current_brightness(dev: Dict[str, Any], bulb: tinytuya.BulbDevice) -> Optional[float]:
     """Return current brightness 0..1 from mode-aware state, else None."""
     try:
-        st = bulb.state()
+        st = _read_state(dev)
         if isinstance(st, dict) and "Error" not in st:
             mode = str(bulb.get_mode(state=st)).lower()
             if mode in ("colour", "color"):
@@ -356,22 +568,20 @@ def _read_current_brightness(dev: Dict[str, Any], bulb: tinytuya.BulbDevice) ->
 
     # Fallback via raw DPS
     try:
-        dps = bulb.status().get("dps", {}) or {}
-        dp_b = _dp_for(dev, ("bright_value_v2", "bright_value", "brightness"))
-        if dp_b and str(dp_b) in dps:
-            meta = dev.get("mapping", {}).get(str(dp_b), {}).get("values", {})
-            dmin = int(meta.get("min", 0)); dmax = int(meta.get("max", 1000)) or 1000
-            val = int(dps[str(dp_b)])
-            return max(0.0, min(1.0, (val - dmin) / float(max(1, dmax - dmin))))
-        for code in ("colour_data_v2","color_data_v2","colour_data","color_data"):
-            dp_c = _dp_for(dev, (code,))
-            if not dp_c or str(dp_c) not in dps or dps[str(dp_c)] is None:
+        dps = _device_status(dev)
+        dp_b = dev["dp_brightness_s"]
+        if dp_b and dp_b in dps:
+            dmin, inv_range = dev["bright_scale"]  # None (unusable range) raises into the except below
+            val = int(dps[dp_b])
+            return max(0.0, min(1.0, (val - dmin) * inv_range))
+        for dp_c in dev["dp_colour_s"]:
+            raw = dps.get(dp_c)
+            if raw is None:
                 continue
-            raw = dps[str(dp_c)]
             if isinstance(raw, str) and raw.strip().startswith("{"):
-                obj = json.loads(raw); v = float(obj.get("v", obj.get("V", 1000)))
+                obj = _loads(raw); v = float(obj.get("v", obj.get("V", 1000)))
             elif isinstance(raw, str):
-                m = re.match(r"^\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*$", raw)
+                m = _HSV_CSV_RE.match(raw)
                 if not m: continue
                 v = float(m.group(3))
             elif isinstance(raw, dict):
@@ -384,17 +594,17 @@ def _read_current_brightness(dev: Dict[str, Any], bulb: tinytuya.BulbDevice) ->
     return None
 
 def _apply_rgb(dev, bulb, r, g, b, saturation: float | None = None, brightness: float | None = None):
-    import colorsys
-
     r = max(0, min(255, int(r))); g = max(0, min(255, int(g))); b = max(0, min(255, int(b)))
-    h, s_calc, _ = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
+    h, s, _ = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
+    _apply_hs(dev, bulb, h, s, saturation, brightness)
 
+def _apply_hs(dev, bulb, h: float, s_calc: float, saturation: float | None = None, brightness: float | None = None):
     s = s_calc if saturation is None else max(0.0, min(1.0, float(saturation)))
 
     if brightness is None:
         # preserve current brightness regardless of mode
         try:
-            st = bulb.state()
+            st = _read_state(dev)
             if isinstance(st, dict) and "Error" not in st:
                 mode = str(bulb.get_mode(state=st)).lower()
                 if mode in ("colour", "color"):
@@ -411,7 +621,7 @@ def _apply_rgb(dev, bulb, r, g, b, saturation: float | None = None, brightness:
         v = max(0.0, min(1.0, float(brightness)))
 
     # set_hsv switches to colour mode without resetting v
-    bulb.set_hsv(h, s, v)
+    _send(dev, "set_hsv", h, s, v)
 
 
 # ---------------------------------------- Brightness ----------------------------------------
@@ -428,7 +638,7 @@ def light_brightness(name_or_id: str, percent: int):
 
     # Read mode via library (robust across DP variants)
     try:
-        st = bulb.state()
+        st = _read_state(dev)
     except Exception:
         st = None
     try:
@@ -437,13 +647,13 @@ def light_brightness(name_or_id: str, percent: int):
         mode = str((st or {}).get("mode", "")).lower() if isinstance(st, dict) else ""
 
     if mode in ("colour", "color"):
-        hsv = _read_current_hsv(dev, bulb)
+        hsv = _read_current_hsv(dev, bulb, st)  # reuse the state read above: one round trip, not two
         if hsv:
             h, s, _ = hsv
-            return bulb.set_hsv(h, s, v_new)  # stays in colour, preserves H/S
+            return _send(dev, "set_hsv", h, s, v_new)  # stays in colour, preserves H/S
         # Fallback if HSV unreadable
-        return bulb.set_brightness_percentage(pct)
+        return _send(dev, "set_brightness_percentage", pct)
 
     # White or unknown → library handles scaling and DP
-    return bulb.set_brightness_percentage(pct)
+    return _send(dev, "set_brightness_percentage", pct)
 
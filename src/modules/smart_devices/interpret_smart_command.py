@@ -1,5 +1,6 @@
 # modules/smart_devices/interpret_smart_command.py
-import json, re, threading, difflib, unicodedata
+import re, threading, difflib, unicodedata
+from concurrent.futures import ThreadPoolExecutor
 
 from modules.weather.weather_api import get_weather
 from modules.voice_synth.voice_synth import speak_async
@@ -10,28 +11,28 @@ from modules.google_search.search_for_answers import answer_with_search
 from modules.application_control.open_games import launch_game_by_name
 
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Any
 from .control_smart_devices import (
-    light_on, light_off, light_toggle, light_color, _find_file, light_brightness
+    light_on, light_off, light_toggle, light_color, _find_file, _read_json, light_brightness,
+    _SNAPSHOT,
 )
 
+try:
+    from rapidfuzz import fuzz, process  # optional, C++ matcher instead of difflib's SequenceMatcher
+    _HAS_RF = True
+except ImportError:
+    _HAS_RF = False
+
 # ------- load devices + snapshot -------
 DEVICES_JSON_PATH: Path | None = _find_file("devices.json")
-SNAPSHOT_JSON_PATH: Path | None = _find_file("snapshot.json")
 if not DEVICES_JSON_PATH:
     raise FileNotFoundError("devices.json not found. Set SMART_DEVICES_DIR or place it in project root.")
 
-with DEVICES_JSON_PATH.open("r", encoding="utf-8") as f:
-    _DEVICES: List[Dict[str, Any]] = json.load(f)
+_DEVICES: List[Dict[str, Any]] = _read_json(DEVICES_JSON_PATH)
 
-_SNAPSHOT: Dict[str, Dict[str, Any]] = {}
-if SNAPSHOT_JSON_PATH and SNAPSHOT_JSON_PATH.exists():
-    snap = json.load(SNAPSHOT_JSON_PATH.open("r", encoding="utf-8"))
-    for d in snap.get("devices", []):
-        did = d.get("id")
-        if did:
-            _SNAPSHOT[did] = {"ip": d.get("ip"), "ver": d.get("ver") or d.get("version") or "3.3"}
+# _SNAPSHOT ({id: {"ip", "ver"}}) comes from the control module's cached index rather than a second parse
 
 # canonical maps
 _DEVICE_BY_NAME: Dict[str, Dict[str, Any]] = {}
@@ -50,7 +51,7 @@ for d in _DEVICES:
     _DEVICE_BY_NAME[name.lower()] = d
     _DEVICE_NAMES.append(name)
 
-_DEVICE_TOKENS = {name: set(re.sub(r"[^a-z0-9 ]+", "", name.lower()).split()) for name in _DEVICE_NAMES}
+_DEVICE_TOKENS = {name: frozenset(re.sub(r"[^a-z0-9 ]+", "", name.lower()).split()) for name in _DEVICE_NAMES}
 
 # ------- vocab -------
 _LAUNCH_WORDS = {"launch", "open up", "start up", "boot up"}
@@ -125,29 +126,98 @@ _WHITE_COLOR_WORDS = (
     "bright white","arctic white"
 )
 _GENERIC_TOKENS = {"light", "lights", "lamp"}
+# what's left of each device name once generic words are dropped, for scoring
+_DEVICE_SIG = {name: toks - _GENERIC_TOKENS for name, toks in _DEVICE_TOKENS.items()}
+_DEVICE_SIG_LEN = {name: max(1, len(sig)) for name, sig in _DEVICE_SIG.items()}
+# each signature as a bitmask over the device vocabulary, so overlap is an AND + popcount
+_VOCAB: Dict[str, int] = {}
+_DEVICE_MASKS: List[Tuple[str, int, int]] = []  # (name, signature mask, signature length)
+for name, sig in _DEVICE_SIG.items():
+    mask = 0
+    for tok in sig:
+        mask |= 1 << _VOCAB.setdefault(tok, len(_VOCAB))
+    _DEVICE_MASKS.append((name, mask, _DEVICE_SIG_LEN[name]))
 _HEX_RE = re.compile(r"#(?:[0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b")
+_NORMALIZE_RE = re.compile(r"[^a-z0-9 #%]")
+# same filter as _NORMALIZE_RE as a bytes delete table; str.translate with a dict is slower than the regex
+_NORMALIZE_DROP = bytes(b for b in range(256) if b not in b"abcdefghijklmnopqrstuvwxyz0123456789 #%")
+_BRIGHT_SET_RE = re.compile(r"(?:brightness|bright)\s*(?:to|at|=)?\s*(\d{1,3})\s*%?")
+_BRIGHT_SUFFIX_RE = re.compile(r"(\d{1,3})\s*%?\s*(?:brightness|bright)")
+_TO_PERCENT_RE = re.compile(r"\b(?:to|at)\s*(\d{1,3})\s*%?\b")
+_PERCENT_RE = re.compile(r"\b(\d{1,3})\s*%\b")
+_BARE_NUMBER_RE = re.compile(r"\b(\d{1,3})\b")
+_FILLER_RE = re.compile(r"\b(turn|set|switch|the|my|in|to|at|please|a|an|by|of)\b")
+_ACTION_RE = re.compile(r"\b(on|off|toggle)\b")
+_SPACES_RE = re.compile(r"\s+")
+_LAUNCH_RE = re.compile(r"\b(?:open up|start up|boot up|launch)\b")
+
+def _alts(words) -> str:
+    # longest first so "warm white" wins over "white"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+def _word_alt(words) -> re.Pattern:
+    return re.compile(rf"\b(?:{_alts(words)})\b")
+
+_WORD_RUN_RE = re.compile(r"[a-z0-9]+")  # the \b-delimited words of normalized text
+
+def _vocab(words) -> Tuple[frozenset, Optional[re.Pattern]]:
+    # single words are checked against the text's token set; only multi-word phrases need a regex
+    single = frozenset(w for w in words if w.isalnum())
+    phrases = [w for w in words if not w.isalnum()]
+    return single, (_word_alt(phrases) if phrases else None)
+
+_WEATHER_VOCAB = _vocab(_WEATHER_WORDS)
+_MATH_VOCAB = _vocab(_MATH_WORDS)
+_TIME_DATE_VOCAB = _vocab(_TIME_DATE_WORDS)
+_BRIGHTNESS_VOCAB = _vocab(_BRIGHTNESS)
+_GENERIC_LIGHT_VOCAB = _vocab(_GENERIC_LIGHT_TOKENS)
+_COLOR_ALT_RE = _word_alt(_COLOR_WORDS)
+_WHITE_ALT_RE = _word_alt(_WHITE_COLOR_WORDS)
+# Light-control keywords, classified by one finditer (m.lastgroup is the kind).
+# No phrase overlaps one of another kind; "turn/switch on|off" come first so
+# they're read as a whole phrase rather than as "switch" + "on".
+_INTENT_RE = re.compile(r"\b(?:" + "|".join((
+    r"(?P<turn_on>(?:turn|switch)\s+on)",
+    r"(?P<turn_off>(?:turn|switch)\s+off)",
+    rf"(?P<dim>{_alts(_DIM_WORDS)})",
+    rf"(?P<brighten>{_alts(_BRIGHTEN_WORDS)})",
+    rf"(?P<status>{_alts(_STATUS)})",
+    rf"(?P<toggle>{_alts(_TOGGLE_WORDS)})",
+    rf"(?P<on>{_alts(_ON_WORDS)})",
+    rf"(?P<off>{_alts(_OFF_WORDS)})",
+)) + r")\b")
 
 # ------- helpers -------
+# Parsing helpers below are cached: devices are loaded once at import, so a
+# live reload of devices.json would also have to cache_clear() them.
+@lru_cache(maxsize=512)
 def _normalize(s: str) -> str:
-    return re.sub(r"[^a-z0-9 #%]", "", s.lower()).strip()
+    s = s.lower()
+    if s.isascii():
+        return s.encode("ascii").translate(None, _NORMALIZE_DROP).decode("ascii").strip()
+    return _NORMALIZE_RE.sub("", s).strip()
+
+@lru_cache(maxsize=512)
+def _tokens(t: str) -> frozenset:
+    return frozenset(_WORD_RUN_RE.findall(t))
 
-def _contains_word(text: str, word: str) -> bool:
-    return re.search(rf"\b{re.escape(word)}\b", text) is not None
+def _mentions(t: str, vocab: Tuple[frozenset, Optional[re.Pattern]]) -> bool:
+    """Whether normalized text t contains any word or phrase of a _vocab()."""
+    single, phrases = vocab
+    return not single.isdisjoint(_tokens(t)) or (phrases is not None and phrases.search(t) is not None)
 
+@lru_cache(maxsize=512)
 def _has_color(text: str) -> Optional[str]:
     h = _HEX_RE.search(text)
     if h:
         return h.group(0)
-    for c in sorted(_COLOR_WORDS, key=len, reverse=True):
-        if re.search(rf"\b{re.escape(c)}\b", text):
-            return c
-    return None
+    # longest colour named anywhere in the text
+    return max((m.group(0) for m in _COLOR_ALT_RE.finditer(text)), key=len, default=None)
 
 def _extract_brightness_strict(text: str) -> Optional[int]:
-    if not any(_contains_word(text, w) for w in _BRIGHTNESS):
+    if not _mentions(text, _BRIGHTNESS_VOCAB):
         return None
-    m = re.search(r"(?:brightness|bright)\s*(?:to|at|=)?\s*(\d{1,3})\s*%?", text) \
-        or re.search(r"(\d{1,3})\s*%?\s*(?:brightness|bright)", text)
+    m = _BRIGHT_SET_RE.search(text) or _BRIGHT_SUFFIX_RE.search(text)
     if not m:
         return None
     v = int(m.group(1))
@@ -156,42 +226,47 @@ def _extract_brightness_strict(text: str) -> Optional[int]:
 def _extract_brightness_loose(text: str, targets: List[str]) -> Optional[int]:
     if not _looks_like_light(text, targets):
         return None
-    m = re.search(r"\b(?:to|at)\s*(\d{1,3})\s*%?\b", text) or re.search(r"\b(\d{1,3})\s*%\b", text)
+    m = _TO_PERCENT_RE.search(text) or _PERCENT_RE.search(text)
     if not m and targets:
-        m = re.search(r"\b(\d{1,3})\b", text)
+        m = _BARE_NUMBER_RE.search(text)
     if not m:
         return None
     v = int(m.group(1))
     return max(0, min(100, v))
 
 def _looks_like_light(text: str, targets: List[str]) -> bool:
-    if any(_contains_word(text, w) for w in _GENERIC_LIGHT_TOKENS):
+    if _mentions(text, _GENERIC_LIGHT_VOCAB):
         return True
     for t in targets:
         if any(w in t.lower() for w in _GENERIC_LIGHT_TOKENS):
             return True
     return False
 
+def _token_mask(tokens) -> int:
+    mask = 0
+    for tok in tokens:
+        bit = _VOCAB.get(tok)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
 def _best_devices_from_tokens(qt: set[str]) -> List[str]:
     if qt & _ALL_WORDS:
         return list(_DEVICE_NAMES)
 
     room_tokens = qt & _ROOM_HINTS
-    qsig = {t for t in qt if t not in _GENERIC_TOKENS}
-
-    candidates = {
-        name: toks for name, toks in _DEVICE_TOKENS.items()
-        if not room_tokens or (toks & room_tokens)
-    }
+    room_mask = _token_mask(room_tokens)
+    qmask = _token_mask(qt - _GENERIC_TOKENS)
 
-    def score(tokens: set[str]) -> float:
-        sig = {t for t in tokens if t not in _GENERIC_TOKENS}
-        inter = len(sig & qsig)
-        if inter == 0:
-            return 0.0
-        return inter / max(1, len(sig))
-
-    scored = sorted(((score(tokens), name) for name, tokens in candidates.items()), reverse=True)
+    # nothing under 0.5 is ever returned, so only the few real contenders get sorted
+    scored = []
+    for name, dmask, dlen in _DEVICE_MASKS:
+        if room_tokens and not dmask & room_mask:
+            continue
+        s = (qmask & dmask).bit_count() / dlen
+        if s >= 0.5:
+            scored.append((s, name))
+    scored.sort(reverse=True)
     hits = [name for s, name in scored if s >= 0.67]
     if hits:
         return hits
@@ -201,44 +276,39 @@ def _best_devices_from_tokens(qt: set[str]) -> List[str]:
             return hits
     return []
 
-def _best_device_freeform(query: str) -> List[str]:
+@lru_cache(maxsize=512)
+def _best_device_freeform(query: str) -> Tuple[str, ...]:
     qt = set(_normalize(query).split())
     if not qt or not _DEVICE_TOKENS:
-        return []
+        return ()
     hits = _best_devices_from_tokens(qt)
     if hits:
-        return hits
+        return tuple(hits)
 
     qn = " ".join(qt)
     if len(qn) >= 5:
         for name in _DEVICE_NAMES:
             if _normalize(name) in qn or qn in _normalize(name):
-                return [name]
-    m = difflib.get_close_matches(" ".join(qt), _DEVICE_NAMES, n=1, cutoff=0.7)
-    return m if m else []
-
-def _extract_targets(text: str) -> List[str]:
-    stripped = re.sub(r"\b(turn|set|switch|the|my|in|to|at|please|a|an|by|of)\b", " ", text)
-    stripped = re.sub(r"\b(on|off|toggle)\b", " ", stripped)
-    stripped = re.sub(r"\s+", " ", stripped).strip()
+                return (name,)
+    if _HAS_RF:
+        # fuzz.ratio (Indel-based, 0..100) is close to difflib's ratio but not identical; 70 mirrors the 0.7 cutoff
+        m = process.extractOne(" ".join(qt), _DEVICE_NAMES, scorer=fuzz.ratio, score_cutoff=70)
+        return (m[0],) if m else ()
+    return tuple(difflib.get_close_matches(" ".join(qt), _DEVICE_NAMES, n=1, cutoff=0.7))
+
+@lru_cache(maxsize=512)
+def _extract_targets(text: str) -> Tuple[str, ...]:
+    stripped = _FILLER_RE.sub(" ", text)
+    stripped = _ACTION_RE.sub(" ", stripped)
+    stripped = _SPACES_RE.sub(" ", stripped).strip()
     targets = _best_device_freeform(stripped)
     if not targets and len(_DEVICE_NAMES) == 1:
-        return _DEVICE_NAMES[:]
+        return tuple(_DEVICE_NAMES)
     return targets
 
 def _filter_online(targets: List[str]) -> List[str]:
-    out = []
-    for name in targets:
-        meta = _DEVICE_BY_NAME.get(name.lower())
-        if not meta:
-            continue
-        ip = meta.get("ip")
-        if ip:
-            out.append(name)
-        else:
-            # allow if only one known device of that name; control module can still resolve via snapshot at runtime
-            out.append(name)
-    return out
+    # known devices pass with or without an ip; control module can still resolve via snapshot at runtime
+    return [name for name in targets if name.lower() in _DEVICE_BY_NAME]
 
 def _all_room_devices(room: Optional[str]) -> List[str]:
     if not room:
@@ -259,7 +329,7 @@ def _strip_edge_punct(s: str) -> str:
 def extract_game_query(text: str) -> str:
     low = text.lower()
     # find first launch phrase anywhere; keep hyphens in the remainder
-    m = re.search(r"\b(?:open up|start up|boot up|launch)\b", low)
+    m = _LAUNCH_RE.search(low)
     if not m:
         return _strip_edge_punct(text)
     return _strip_edge_punct(text[m.end():])
@@ -351,10 +421,9 @@ def _run_action(action: str, value: Optional[str], targets: List[str]) -> str:
 
 # ------- parser -------
 def parse_command(text: str) -> Tuple[str, Optional[str], List[str]]:
-    if re.search(r"\b(?:open up|start up|boot up|launch)\b", text.lower()):
+    if _LAUNCH_RE.search(text.lower()):
         return "launch_app", extract_game_query(text), []
     t = _normalize(text)
-    targets_guess = _extract_targets(t)
 
     # app launch queries
     if any(p in t for p in _LAUNCH_WORDS):
@@ -362,17 +431,17 @@ def parse_command(text: str) -> Tuple[str, Optional[str], List[str]]:
         return "launch_app", query, []
 
     # weather queries
-    if any(_contains_word(t, w) for w in _WEATHER_WORDS):
+    if _mentions(t, _WEATHER_VOCAB):
         m = _PLACE_RE.search(text.strip())
         place = m.group(1).strip() if m else None
         return "weather", place, []  # targets unused
     
     # maths
-    if any(_contains_word(t, w) for w in _MATH_WORDS) or _MATH_SYM_RE.search(text):
+    if _mentions(t, _MATH_VOCAB) or _MATH_SYM_RE.search(text):
         return "math", text, []
     
     # time
-    if any(_contains_word(t, w) for w in _TIME_DATE_WORDS):
+    if _mentions(t, _TIME_DATE_VOCAB):
         return "time", text, []
     
     resp = handle_timer_intent(text)
@@ -382,18 +451,28 @@ def parse_command(text: str) -> Tuple[str, Optional[str], List[str]]:
     if any(text.lower().startswith(q) for q in _SEARCH_START):
         return "search", text, []
     
-    if any(_contains_word(t, w) for w in _DIM_WORDS) and _looks_like_light(t, targets_guess):
+    action, value, targets = _parse_light_intent(t)
+    return action, value, list(targets)
+
+@lru_cache(maxsize=512)
+def _parse_light_intent(t: str) -> Tuple[str, Optional[str], Tuple[str, ...]]:
+    """The light-control half of parse_command. Unlike the timer check before it,
+    this only depends on the normalized text, so repeated phrases are cached."""
+    targets_guess = _extract_targets(t)
+    kinds = {m.lastgroup for m in _INTENT_RE.finditer(t)}
+
+    if "dim" in kinds and _looks_like_light(t, targets_guess):
         return "brightness", "30", targets_guess
-    if any(_contains_word(t, w) for w in _BRIGHTEN_WORDS) and _looks_like_light(t, targets_guess):
+    if "brighten" in kinds and _looks_like_light(t, targets_guess):
         return "brightness", "100", targets_guess
 
-    if any(_contains_word(t, w) for w in _STATUS):
-        return "status", None, _extract_targets(t)
+    if "status" in kinds:
+        return "status", None, targets_guess
 
-    if re.search(r"\b(turn|switch)\s+on\b", t):
-        return "on", None, _extract_targets(t)
-    if re.search(r"\b(turn|switch)\s+off\b", t):
-        return "off", None, _extract_targets(t)
+    if "turn_on" in kinds:
+        return "on", None, targets_guess
+    if "turn_off" in kinds:
+        return "off", None, targets_guess
     
     b = _extract_brightness_strict(t)
     if b is None:
@@ -405,21 +484,22 @@ def parse_command(text: str) -> Tuple[str, Optional[str], List[str]]:
 
     color = _has_color(t)
     if color:
-        return "color", color, _extract_targets(t)
+        return "color", color, targets_guess
 
-    if any(_contains_word(t, w) for w in _TOGGLE_WORDS):
-        return "toggle", None, _extract_targets(t)
-    if any(_contains_word(t, w) for w in _OFF_WORDS) and not any(_contains_word(t, w) for w in _ON_WORDS):
-        return "off", None, _extract_targets(t)
-    if any(_contains_word(t, w) for w in _ON_WORDS) and not any(_contains_word(t, w) for w in _OFF_WORDS):
-        return "on", None, _extract_targets(t)
+    if "toggle" in kinds:
+        return "toggle", None, targets_guess
+    has_on, has_off = "on" in kinds, "off" in kinds
+    if has_off and not has_on:
+        return "off", None, targets_guess
+    if has_on and not has_off:
+        return "on", None, targets_guess
 
     # presets to map into color handler
-    for preset in _WHITE_COLOR_WORDS:
-        if _contains_word(t, preset):
-            return "color", preset, _extract_targets(t)
+    m = _WHITE_ALT_RE.search(t)
+    if m:
+        return "color", m.group(0), targets_guess
 
-    return "unknown", None, []
+    return "unknown", None, ()
 
 # ------- executor -------
 def _ensure_targets(targets: List[str]) -> List[str]:
@@ -427,14 +507,23 @@ def _ensure_targets(targets: List[str]) -> List[str]:
         return targets
     return []
 
+# Each device op is a blocking Tuya round trip, so a group command fans out instead of queueing
+_DEVICE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="smart-dev")
+
 def _exec_each(targets: List[str], fn):
-    outputs = []
-    for dev in targets:
+    def _one(dev: str) -> str:
         try:
             msg = fn(dev)
         except Exception as e:
             msg = f"Error: {e}"
-        outputs.append(f"{dev}: {msg}")
+        return f"{dev}: {msg}"
+
+    # a device named twice in one command is only written once
+    targets = list(dict.fromkeys(targets))
+    if len(targets) == 1:
+        outputs = [_one(targets[0])]
+    else:
+        outputs = list(_DEVICE_POOL.map(_one, targets))
     return "\n".join(outputs) if outputs else "Sorry, I didn't understand that."
 
 def execute_command(text: str, room: str | None = None) -> str:
@@ -7,35 +7,39 @@ try:
     import simpleaudio as sa  # pip install simpleaudio
 except Exception:
     sa = None
-import math
+import numpy as np
+from functools import lru_cache
+
+_SR = 44100
+
+@lru_cache(maxsize=None)
+def _beep(freq_hz: float, dur_s: float = 0.12, sr: int = _SR, glide: float = 1.03) -> bytes:
+    n = int(sr * dur_s)
+    i = np.arange(n, dtype=np.float64)
+    t = i / sr
+    # tiny upward glide
+    f = freq_hz * (1.0 + (glide - 1.0) * i / (n - 1))
+    # add a bit of 2nd harmonic for "alarm" bite
+    s = np.sin(2*np.pi*f*t) + 0.35 * np.sin(2*np.pi*2*f*t)
+    # fast attack + exponential decay envelope
+    attack = np.minimum(t / 0.01, 1.0)          # ~10 ms attack
+    env = attack * np.exp(-5.0 * t / dur_s)     # percussive decay
+    pcm = (32767 * 0.22 * s * env).astype("<i2")  # truncates toward zero like int()
+    return pcm.tobytes()
+
+@lru_cache(maxsize=None)
+def _alarm_pcm(base: float, sr: int = _SR) -> bytes:
+    """One beep-beep-beep group with its gaps rendered as silence, synthesized once."""
+    beep = _beep(base, 0.12, sr)
+    gap, pause = bytes(2 * int(sr * 0.08)), bytes(2 * int(sr * 0.35))
+    return beep + gap + beep + gap + beep + pause
 
 def _ring_once():
     """Beep-beep pattern: 1.0 kHz then 1.4 kHz with short gaps."""
     if sa:
-      def _beep(freq_hz: float, dur_s: float = 0.12, sr: int = 44100, glide: float = 1.03):
-          n = int(sr * dur_s)
-          samples = bytearray()
-          for i in range(n):
-              t = i / sr
-              # tiny upward glide
-              f = freq_hz * (1.0 + (glide - 1.0) * i / (n - 1))
-              # add a bit of 2nd harmonic for "alarm" bite
-              s = math.sin(2*math.pi*f*t) + 0.35 * math.sin(2*math.pi*2*f*t)
-              # fast attack + exponential decay envelope
-              attack = min(t / 0.01, 1.0)                 # ~10 ms attack
-              env = attack * math.exp(-5.0 * t / dur_s)   # percussive decay
-              v = int(32767 * 0.22 * s * env)
-              samples += v.to_bytes(2, "little", signed=True)
-          sa.play_buffer(bytes(samples), 1, 2, sr).wait_done()
-
-      def play_timer_alarm():
-          base = 720  # try 580–700 to taste
-          for _ in range(8):
-              _beep(base, 0.12); time.sleep(0.08)
-              _beep(base, 0.12); time.sleep(0.08)
-              _beep(base, 0.12); time.sleep(0.35)
-
-      play_timer_alarm()
+      pcm = _alarm_pcm(720)  # try 580–700 to taste
+      for _ in range(8):
+          sa.play_buffer(pcm, 1, 2, _SR).wait_done()
 
     elif platform.system() == "Windows":
         print("Windows Alarm")
@@ -49,8 +53,8 @@ def _ring_once():
         sys.stdout.write('\a'); sys.stdout.flush(); time.sleep(0.35)
 
 
-def _fmt_ms(ms: int) -> str:
-    s = max(0, ms // 1000)
+def _fmt_s(secs: float) -> str:
+    s = max(0, int(secs))
     h, s = divmod(s, 3600)
     m, s = divmod(s, 60)
     parts = []
@@ -63,19 +67,16 @@ class TimerManager:
     def __init__(self):
         self._lock = threading.Lock()
         self._t: Optional[threading.Thread] = None
-        self._end_ms: Optional[int] = None
+        self._deadline: Optional[float] = None  # time.monotonic() when the timer fires
         self._stop = threading.Event()
         self._beep_stop = threading.Event()
 
-    def _now_ms(self) -> int:
-        return int(time.monotonic() * 1000)
-
     def _ring_loop(self):
       # ring up to 5s or until stopped
-      t_end = self._now_ms() + 5000
-      while not self._beep_stop.is_set() and self._now_ms() < t_end:
+      t_end = time.monotonic() + 5
+      while not self._beep_stop.is_set() and time.monotonic() < t_end:
           _ring_once()
-          time.sleep(0.3)
+          self._beep_stop.wait(0.3)
 
     def is_ringing(self) -> bool:
         # True while the ring loop is allowed to run
@@ -83,22 +84,20 @@ class TimerManager:
 
 
     def _runner(self, duration_ms: int):
-      deadline = self._now_ms() + duration_ms
+      deadline = time.monotonic() + duration_ms / 1000
       with self._lock:
-          self._end_ms = deadline
-      while not self._stop.is_set():
-          if deadline - self._now_ms() <= 0:
-              break
-          time.sleep(0.2)
+          self._deadline = deadline
+      # sleep straight through to the deadline; stop_timer() wakes this immediately
+      stopped = self._stop.wait(max(0.0, deadline - time.monotonic()))
 
-      if not self._stop.is_set():
+      if not stopped:
           self._beep_stop.clear()       # enable ringing
           self._ring_loop()
 
       # cleanup
       with self._lock:
           self._t = None
-          self._end_ms = None
+          self._deadline = None
           self._stop.clear()
           self._beep_stop.set()         # disable ringing
 
@@ -112,16 +111,16 @@ class TimerManager:
         th = threading.Thread(target=self._runner, args=(duration_ms,), daemon=True)
         self._t = th
         th.start()
-        return f"Timer set for {_fmt_ms(duration_ms)}."
+        return f"Timer set for {_fmt_s(duration_ms / 1000)}."
 
     def time_left(self) -> str:
         with self._lock:
-            if self._end_ms is None:
+            if self._deadline is None:
                 return "No active timer."
-            left = self._end_ms - self._now_ms()
+            left = self._deadline - time.monotonic()
         if left <= 0:
             return "Timer has finished."
-        return f"{_fmt_ms(left)} remaining."
+        return f"{_fmt_s(left)} remaining."
 
     def stop_timer(self) -> str:
         with self._lock:
@@ -138,55 +137,55 @@ _DURATION_RE = re.compile(
     re.I,
 )
 _IN_RE = re.compile(r"\b(?:in|for)\b", re.I)
+# unit typos: sec, secs, secnds, ... / min, mins / hr, hrs
+_UNIT_TYPO_RE = re.compile(r"\b(?:sec?n?d?s?|mins?|hrs?)\b")
+_UNIT_FULL = {"s": "seconds", "m": "minutes", "h": "hours"}
+# match (number | number-words) + unit, in any order, multiple segments
+_DURATION_TOKEN_RE = re.compile(
+    r"(?P<num>\d+|(?:a|an|zero|one|two|three|four|five|six|seven|eight|nine|ten|"
+    r"eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|"
+    r"twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety)(?:[-\s](?:one|two|three|four|five|six|seven|eight|nine))?(?:\s+hundred)?)"
+    r"\s*(?P<unit>hours?|hrs?|h|minutes?|mins?|m|seconds?|secs?|s)\b",
+    re.I,
+)
+
+# number words → int
+_ONES = {
+    "zero":0,"one":1,"two":2,"three":3,"four":4,"five":5,"six":6,"seven":7,"eight":8,"nine":9,
+    "ten":10,"eleven":11,"twelve":12,"thirteen":13,"fourteen":14,"fifteen":15,
+    "sixteen":16,"seventeen":17,"eighteen":18,"nineteen":19,
+    "a":1,"an":1
+}
+_TENS = {"twenty":20,"thirty":30,"forty":40,"fifty":50,"sixty":60,"seventy":70,"eighty":80,"ninety":90}
+
+def _words_to_int(s: str) -> Optional[int]:
+    s = s.replace("-", " ")
+    parts = [p for p in s.split() if p]
+    if not parts: return None
+    total = 0
+    i = 0
+    while i < len(parts):
+        w = parts[i]
+        if w in _ONES:
+            total += _ONES[w]; i += 1; continue
+        if w in _TENS:
+            val = _TENS[w]; i += 1
+            if i < len(parts) and parts[i] in _ONES and _ONES[parts[i]] < 10:
+                val += _ONES[parts[i]]; i += 1
+            total += val; continue
+        if w == "hundred":
+            total = max(1,total) * 100; i += 1; continue
+        return None
+    return total
 
 def parse_duration_ms(text: str) -> Optional[int]:
     t = text.lower()
 
-    # quick unit typo normalisation
-    t = re.sub(r"\bsec?n?d?s?\b", "seconds", t)   # sec, secs, secnds, second(s)
-    t = re.sub(r"\bmins?\b", "minutes", t)        # min, mins
-    t = re.sub(r"\bhrs?\b", "hours", t)           # hr, hrs
-
-    # number words → int
-    ONES = {
-        "zero":0,"one":1,"two":2,"three":3,"four":4,"five":5,"six":6,"seven":7,"eight":8,"nine":9,
-        "ten":10,"eleven":11,"twelve":12,"thirteen":13,"fourteen":14,"fifteen":15,
-        "sixteen":16,"seventeen":17,"eighteen":18,"nineteen":19,
-        "a":1,"an":1
-    }
-    TENS = {"twenty":20,"thirty":30,"forty":40,"fifty":50,"sixty":60,"seventy":70,"eighty":80,"ninety":90}
-
-    def _words_to_int(s: str) -> Optional[int]:
-        s = s.replace("-", " ")
-        parts = [p for p in s.split() if p]
-        if not parts: return None
-        total = 0
-        i = 0
-        while i < len(parts):
-            w = parts[i]
-            if w in ONES:
-                total += ONES[w]; i += 1; continue
-            if w in TENS:
-                val = TENS[w]; i += 1
-                if i < len(parts) and parts[i] in ONES and ONES[parts[i]] < 10:
-                    val += ONES[parts[i]]; i += 1
-                total += val; continue
-            if w == "hundred":
-                total = max(1,total) * 100; i += 1; continue
-            return None
-        return total
-
-    # match (number | number-words) + unit, in any order, multiple segments
-    pattern = re.compile(
-        r"(?P<num>\d+|(?:a|an|zero|one|two|three|four|five|six|seven|eight|nine|ten|"
-        r"eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|"
-        r"twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety)(?:[-\s](?:one|two|three|four|five|six|seven|eight|nine))?(?:\s+hundred)?)"
-        r"\s*(?P<unit>hours?|hrs?|h|minutes?|mins?|m|seconds?|secs?|s)\b",
-        re.I,
-    )
+    # quick unit typo normalisation, one pass for all three units
+    t = _UNIT_TYPO_RE.sub(lambda m: _UNIT_FULL[m.group(0)[0]], t)
 
     h = m = s = 0
-    for mobj in pattern.finditer(t):
+    for mobj in _DURATION_TOKEN_RE.finditer(t):
         raw_num = mobj.group("num").lower()
         unit = mobj.group("unit").lower()
 
@@ -1,14 +1,43 @@
 
-import threading, queue, sys, wave
+import threading, queue, sys, wave, io, os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import numpy as np
 import sounddevice as sd
 import webrtcvad
+import ctranslate2
 from faster_whisper import WhisperModel
 
 _ALLOWED = {8000, 16000, 32000, 48000}
 
+# Pre-quantized CTranslate2 models live here, e.g. models/whisper-large-v3-int8 from
+#   ct2-transformers-converter --model openai/whisper-large-v3 --quantization int8 --output_dir models/whisper-large-v3-int8
+MODELS = Path(__file__).resolve().parents[3] / "models"
+
+# First-pass results below this mean avg_logprob (or likely non-speech) are re-run on the large model
+CASCADE_MIN_LOGPROB = -0.5
+CASCADE_MAX_NO_SPEECH = 0.6
+
+# A pause this long mid-utterance closes a segment, which is transcribed while recording
+# carries on, as long as it holds at least SEGMENT_MIN_MS of audio
+SEGMENT_PAUSE_MS = 300
+SEGMENT_MIN_MS = 1500
+
+def load_whisper(model_name, compute_type=None):
+    """int8 weights everywhere: int8 compute on CPU, int8_float16 on a CUDA GPU."""
+    if ctranslate2.get_cuda_device_count() > 0:
+        device, default_ct = "cuda", "int8_float16"
+    else:
+        device, default_ct = "cpu", "int8"
+    local = MODELS / f"whisper-{model_name}-int8"
+    source = str(local) if local.is_dir() else model_name  # skip load-time quantization when we can
+    # CTranslate2 drops the GIL while decoding; half the cores leaves the rest to face inference
+    return WhisperModel(source, device=device, compute_type=compute_type or default_ct,
+                        cpu_threads=max(1, (os.cpu_count() or 2) // 2))
+
 class VoiceCommandThread(threading.Thread):
-    def __init__(self, handler, device=None, sample_rate=16000, model_name="medium.en"):
+    def __init__(self, handler, device=None, sample_rate=16000, model_name="medium.en", compute_type=None,
+                 fast_model_name="distil-small.en"):
         super().__init__(daemon=True)
         self.handler = handler
         self.device = device
@@ -17,7 +46,9 @@ class VoiceCommandThread(threading.Thread):
         self.frame_samples = int(self.sample_rate * self.frame_ms / 1000)  # exact 20ms
         self.running = True
         self.vad = webrtcvad.Vad(2)
-        self.model = WhisperModel(model_name, compute_type="int8")
+        self.model = load_whisper(model_name, compute_type)
+        # small English-only first pass; the big model only sees what it is unsure about
+        self.fast_model = load_whisper(fast_model_name, compute_type) if fast_model_name else None
         self.uk_bias = ("Use British English spelling and vocabulary. colour, metre, aluminium, "
                         "Glasgow, Edinburgh, Paisley, quid, aye, wee, bairn, lorry, postcode.")
         self.bytebuf = bytearray()
@@ -25,6 +56,11 @@ class VoiceCommandThread(threading.Thread):
         self.silence_ms = 0
         self.started = False
         self.pcm_chunks = []
+        # segments go to one worker so they are decoded in order, each prompted with the last
+        self._stt = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+        self._segments = []   # futures -> text, one per submitted segment
+        self._seg_from = 0    # index into pcm_chunks where the unsubmitted audio starts
+        self._seg_voiced = False
 
     def _cb(self, indata, frames, time_info, status):
         if status:
@@ -61,6 +97,7 @@ class VoiceCommandThread(threading.Thread):
 
                 if voiced:
                     self.pcm_chunks.append(frame_i16)
+                    self._seg_voiced = True
                     self.voiced_ms += self.frame_ms
                     self.silence_ms = 0
                     if not self.started and self.voiced_ms >= 400:
@@ -72,28 +109,75 @@ class VoiceCommandThread(threading.Thread):
                         if self.silence_ms >= 800:
                             self._flush_transcribe()
                             self._reset_state()
+                        elif self.silence_ms == SEGMENT_PAUSE_MS:
+                            self._submit_segment(SEGMENT_MIN_MS)
                     else:
                         self.voiced_ms = max(0, self.voiced_ms - self.frame_ms)
 
-    def _flush_transcribe(self):
-        if not self.pcm_chunks:
-            return
-        pcm16 = np.concatenate(self.pcm_chunks)
-        tmp = "temp_audio/voice_temp.wav"
-        with wave.open(tmp, "wb") as w:
+    def _whisper_input(self, pcm16):
+        if self.sample_rate == 16000:
+            return pcm16.astype(np.float32) / 32768.0  # what faster-whisper takes as-is
+        # other rates go through an in-memory WAV so faster-whisper resamples it
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
             w.setnchannels(1); w.setsampwidth(2); w.setframerate(self.sample_rate)
             w.writeframes(pcm16.tobytes())
+        buf.seek(0)
+        return buf
+
+    def _transcribe(self, pcm16, prompt):
+        text = None
+        if self.fast_model is not None:
+            segs, _ = self.fast_model.transcribe(
+                self._whisper_input(pcm16),
+                language="en",
+                beam_size=1,
+                vad_filter=True,
+                temperature=0.0,
+                initial_prompt=prompt,
+                condition_on_previous_text=False
+            )
+            segs = list(segs)
+            if segs and (sum(s.avg_logprob for s in segs) / len(segs) >= CASCADE_MIN_LOGPROB
+                         and max(s.no_speech_prob for s in segs) <= CASCADE_MAX_NO_SPEECH):
+                text = "".join(s.text for s in segs).strip()
 
-        segs, _ = self.model.transcribe(
-            tmp,
-            language="en",
-            beam_size=5,
-            vad_filter=True,
-            temperature=[0.0, 0.2, 0.4],
-            initial_prompt=self.uk_bias,
-            condition_on_previous_text=False
-        )
-        text = "".join(s.text for s in segs).strip()
+        if text is None:
+            segs, _ = self.model.transcribe(
+                self._whisper_input(pcm16),
+                language="en",
+                beam_size=5,
+                vad_filter=True,
+                temperature=[0.0, 0.2, 0.4],
+                initial_prompt=prompt,
+                condition_on_previous_text=False
+            )
+            text = "".join(s.text for s in segs).strip()
+        return text
+
+    def _transcribe_segment(self, pcm16, prev):
+        # carry the previous segment's words across the cut, like condition_on_previous_text would
+        prompt = self.uk_bias
+        if prev is not None and prev.result():
+            prompt = f"{prompt} {prev.result()}"
+        return self._transcribe(pcm16, prompt)
+
+    def _submit_segment(self, min_ms=0):
+        n = len(self.pcm_chunks) - self._seg_from
+        if not self._seg_voiced or n * self.frame_ms < min_ms:
+            return
+        pcm16 = np.concatenate(self.pcm_chunks[self._seg_from:])
+        prev = self._segments[-1] if self._segments else None
+        self._segments.append(self._stt.submit(self._transcribe_segment, pcm16, prev))
+        self._seg_from = len(self.pcm_chunks)
+        self._seg_voiced = False
+
+    def _flush_transcribe(self):
+        self._submit_segment()
+        if not self._segments:
+            return
+        # earlier segments were decoded while the speaker was still talking
+        text = " ".join(t for t in (f.result() for f in self._segments) if t).strip()
         if text:
             try:
                 self.handler(text)
@@ -105,11 +189,17 @@ class VoiceCommandThread(threading.Thread):
         self.voiced_ms = 0
         self.silence_ms = 0
         self.started = False
+        self._segments = []
+        self._seg_from = 0
+        self._seg_voiced = False
 
     def stop(self):
         self.running = False
+        self._stt.shutdown(wait=False)
 
-def start_voice_commands(handler, device=None, sample_rate=16000, model_name="medium.en"):
-    t = VoiceCommandThread(handler=handler, device=device, sample_rate=sample_rate, model_name=model_name)
+def start_voice_commands(handler, device=None, sample_rate=16000, model_name="medium.en", compute_type=None,
+                         fast_model_name="distil-small.en"):
+    t = VoiceCommandThread(handler=handler, device=device, sample_rate=sample_rate,
+                           model_name=model_name, compute_type=compute_type, fast_model_name=fast_model_name)
     t.start()
     return t
@@ -1,4 +1,4 @@
-import asyncio, websockets, json, time, os
+import asyncio, websockets, json, time, os, queue, threading
 import numpy as np
 from faster_whisper import WhisperModel
 from modules.smart_devices.interpret_smart_command import execute_command
@@ -6,7 +6,13 @@ from modules.smart_devices.interpret_smart_command import execute_command
 
 SECRET = "change_me"
 SAMPLE_RATE = 16000
-model = WhisperModel("medium.en", device="cpu", compute_type="int8", num_workers=os.cpu_count())
+_PCM_SCALE = np.float32(1.0 / 32768.0)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "distil-small.en")  # "medium.en" is slower but a little more accurate
+_CPUS = os.cpu_count() or 1
+# only the stt thread below calls the model, so one replica with every core beats several idle ones
+model = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8",
+                     num_workers=1, cpu_threads=_CPUS)
+STT_TIMEOUT = 30
 
 def log(*a):
     print(f"[{time.strftime('%H:%M:%S')}]"," ".join(str(x) for x in a), flush=True)
@@ -30,13 +36,44 @@ def _route_from_result(result: str, heard: str, room: str | None):
         "skip_tts": False
     }
 
-def _stt_blocking(pcm_bytes: bytes) -> str:
+def _stt_blocking(pcm_bytes: bytes | bytearray) -> str:
     if not pcm_bytes or len(pcm_bytes) < 3200:  # <100ms @16k
         return ""
-    audio = np.frombuffer(pcm_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-    segments, _ = model.transcribe(audio, language="en", beam_size=1, vad_filter=True, temperature=0.0)
+    # int16 -> float32 scaled in one pass; no intermediate unscaled copy
+    audio = np.multiply(np.frombuffer(pcm_bytes, dtype=np.int16), _PCM_SCALE, dtype=np.float32)
+    segments, _ = model.transcribe(audio, language="en", beam_size=1, vad_filter=True, temperature=0.0,
+                                   without_timestamps=True)
     return " ".join(s.text.strip() for s in segments).strip()
 
+# ---- single STT thread: utterances from all clients are queued and transcribed in turn ----
+_stt_q: queue.Queue = queue.Queue()
+
+def _settle(fut: asyncio.Future, text: str | None, err: Exception | None):
+    if fut.done():  # caller already gave up (timeout/disconnect)
+        return
+    if err is not None:
+        fut.set_exception(err)
+    else:
+        fut.set_result(text)
+
+def _stt_worker():
+    while True:
+        pcm, fut, loop = _stt_q.get()
+        try:
+            text = _stt_blocking(pcm)
+        except Exception as e:
+            loop.call_soon_threadsafe(_settle, fut, None, e)
+        else:
+            loop.call_soon_threadsafe(_settle, fut, text, None)
+
+threading.Thread(target=_stt_worker, name="stt", daemon=True).start()
+
+async def _transcribe(pcm: bytes | bytearray) -> str:
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    _stt_q.put((pcm, fut, loop))
+    return await asyncio.wait_for(fut, timeout=STT_TIMEOUT)
+
 def _exec_blocking(text: str, room: str | None) -> str:
     return execute_command(text=text, room=room)
 
@@ -51,15 +88,22 @@ async def handler(ws):
                 buf.extend(msg)
                 continue
 
+            if msg == "__abort__":  # client decided the utterance was too short
+                buf = bytearray(); log("abort; room:", room); continue
+
             if msg == "__end__":
-                pcm = bytes(buf); buf = bytearray()
+                pcm = buf; buf = bytearray()  # hand off the buffer itself; no copy
                 log("end; bytes:", len(pcm), "room:", room)
                 if not pcm:
                     await ws.send(json.dumps({"msg": "", "heard": "", "skip_tts": True}))
                     log("sent: empty (no pcm)"); continue
 
                 try:
-                    text = await asyncio.to_thread(_stt_blocking, pcm)
+                    text = await _transcribe(pcm)
+                except asyncio.TimeoutError:
+                    err = "stt_error: timeout"
+                    await ws.send(json.dumps({"msg": err, "heard": "", "skip_tts": False}))
+                    log(err); continue
                 except Exception as e:
                     err = f"stt_error: {e}"
                     await ws.send(json.dumps({"msg": err, "heard": "", "skip_tts": False}))
@@ -105,6 +149,8 @@ async def handler(ws):
                 log("bad header"); await ws.close(code=4000, reason="bad header"); break
             if hdr.get("secret") != SECRET:
                 log("auth fail"); await ws.close(code=4001, reason="auth"); break
+            if hdr.get("type") == "ping":  # client heartbeat on a persistent connection
+                await ws.send(json.dumps({"type": "pong"})); continue
             if hdr.get("type") != "utterance" or int(hdr.get("sr", SAMPLE_RATE)) != SAMPLE_RATE:
                 log("bad type/sr"); await ws.close(code=4002, reason="bad sample rate or type"); break
             room = str(hdr.get("room") or "").strip() or None
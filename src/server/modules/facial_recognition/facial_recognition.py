@@ -39,55 +39,165 @@ if not PEOPLE:
     sys.exit(1)
 print("Loaded:", ", ".join(PEOPLE.keys()))
 
-# Always use CPU for inference
-app = FaceAnalysis(name="buffalo_l")
-app.prepare(ctx_id=-1, det_size=(640, 640))
-print("Using CPU for recognition.")
-
-def classify_embedding(emb):
-    emb = emb.astype("float32")
-    emb /= (np.linalg.norm(emb) + 1e-9)
-    best_name, best_sim = None, -1.0
-    for name, d in PEOPLE.items():
-        s = float(np.dot(emb, d["centroid"]))
-        if s > best_sim:
-            best_sim, best_name = s, name
-    if best_sim >= PEOPLE[best_name]["thresh"]:
-        return best_name, best_sim
-    return "unknown", best_sim
+# One (N, D) matrix of unit centroids so classification is a single matmul
+_NAMES = list(PEOPLE.keys())
+_CENTROIDS = np.stack([PEOPLE[n]["centroid"] for n in _NAMES])
+_THRESH = np.array([PEOPLE[n]["thresh"] for n in _NAMES], dtype="float32")
+
+# Detector input; FaceAnalysis rescales each frame to this, recognition still uses the full frame
+DET_SIZE = (320, 320)
+# Mean grey-level change (0-255) on a thumbnail below which a frame is skipped as "nothing moved"
+MOTION_THRESH = 3.0
+
+# Ask the camera for small MJPEG frames up front instead of decoding its default (often 1080p)
+CAP_W, CAP_H, CAP_FPS = 640, 480, 15
+
+# Prefer a GPU execution provider when onnxruntime has one, CPU otherwise
+_GPU_PROVIDERS = ("CUDAExecutionProvider", "DmlExecutionProvider")
+_avail = ort.get_available_providers()
+PROVIDERS = [p for p in _GPU_PROVIDERS if p in _avail][:1] + ["CPUExecutionProvider"]
+ON_GPU = PROVIDERS[0] != "CPUExecutionProvider"
+
+# Only detection and ArcFace are used; skipping the landmark and gender/age heads saves three runs per face
+app = FaceAnalysis(name="buffalo_l", providers=PROVIDERS, allowed_modules=["detection", "recognition"])
+app.prepare(ctx_id=0 if ON_GPU else -1, det_size=DET_SIZE)
+
+# ORT releases the GIL inside run(), so face and Whisper inference already overlap; what
+# they fight over is cores. Give the face sessions half so neither pool oversubscribes.
+FACE_THREADS = max(1, (os.cpu_count() or 2) // 2)
+
+def _cpu_session(model_file):
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = FACE_THREADS
+    so.inter_op_num_threads = 1
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(str(model_file), sess_options=so, providers=["CPUExecutionProvider"])
+
+def _use_int8_recognition(app):
+    """Swap the ArcFace session for a dynamically INT8-quantised copy (built once, kept next to the FP32 model)."""
+    rec = app.models.get("recognition")
+    if rec is None:
+        return False
+    src = Path(rec.model_file)
+    dst = src.with_name(src.stem + "_int8.onnx")
+    try:
+        if not dst.exists():
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            tmp = dst.with_suffix(".tmp.onnx")
+            quantize_dynamic(str(src), str(tmp), weight_type=QuantType.QInt8)
+            os.replace(tmp, dst)
+        rec.session = _cpu_session(dst)
+        return True
+    except Exception as e:
+        print("INT8 recognition model unavailable, staying on FP32:", e)
+        return False
+
+# Dynamic INT8 only pays off on CPU; on GPU keep the FP32 graph
+if ON_GPU:
+    print(f"Using {PROVIDERS[0]} for recognition.")
+else:
+    for _m in app.models.values():
+        _m.session = _cpu_session(_m.model_file)
+    if _use_int8_recognition(app):
+        print("Using CPU for recognition (INT8).")
+    else:
+        print("Using CPU for recognition.")
+
+_NO_SIMS = np.empty(0, dtype="float32")
+
+def classify_embeddings(embs):
+    """
+    (F, D) embeddings -> (labels, sims): a tuple of F names and an (F,) float32 array
+    of their similarities, all faces scored against all centroids in one matmul.
+    """
+    embs = embs.astype("float32")
+    embs /= (np.linalg.norm(embs, axis=1, keepdims=True) + 1e-9)
+    sims = embs @ _CENTROIDS.T
+    best = sims.argmax(axis=1)
+    best_sim = sims[np.arange(len(best)), best]
+    known = best_sim >= _THRESH[best]
+    labels = tuple(_NAMES[i] if k else "unknown" for i, k in zip(best.tolist(), known.tolist()))
+    return labels, best_sim
 
 def score_frame(frame):
-    outs = []
-    for f in app.get(frame):
+    # Detect, align every face, then embed them all in one batched ArcFace run
+    # instead of the one-run-per-face that app.get() does
+    _, kpss = app.det_model.detect(frame, max_num=0, metric="default")
+    if kpss is None:
+        return (), _NO_SIMS
+    crops = []
+    for kps in kpss:
         try:
-            _ = face_align.norm_crop(frame, landmark=f.kps, image_size=112)
+            crops.append(face_align.norm_crop(frame, landmark=kps, image_size=112))
         except Exception:
             continue
-        label, sim = classify_embedding(f.embedding)
-        outs.append((label, sim))
-    return outs
+    if not crops:
+        return (), _NO_SIMS
+    return classify_embeddings(app.models["recognition"].get_feat(crops))
+
+def open_camera(index=0):
+    # DirectShow honours the format requests below; MSMF often ignores them
+    backend = cv2.CAP_DSHOW if sys.platform == "win32" else cv2.CAP_ANY
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened() and backend != cv2.CAP_ANY:
+        cap = cv2.VideoCapture(index)
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAP_W)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAP_H)
+    cap.set(cv2.CAP_PROP_FPS, CAP_FPS)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+# Re-send an unchanged set of faces this often so the consumer's sliding cooldowns keep sliding
+REEMIT_S = 5.0
 
 class FaceRecognitionThread(threading.Thread):
-    def __init__(self, result_list, poll_delay=0.05):
+    """
+    Puts the frozenset of names seen onto `out_queue` when it changes, or every
+    REEMIT_S while it holds.
+    """
+    def __init__(self, out_queue, poll_delay=0.25):
         super().__init__(daemon=True)
-        self.result_list = result_list
+        self.out_queue = out_queue
         self.poll_delay = poll_delay
         self._stop_flag = threading.Event()
 
     def run(self):
-        cap = cv2.VideoCapture(0)
+        cap = open_camera(0)
         if not cap.isOpened():
             print("No camera found.")
             return
+        next_due = 0.0
+        prev = None
+        last_names, last_put = None, 0.0
         while not self._stop_flag.is_set():
-            ok, frame = cap.read()
+            # grab() keeps the driver buffer drained without decoding, so the
+            # frame we do process is current rather than poll_delay old
+            if not cap.grab():
+                break
+            now = time.monotonic()
+            if now < next_due:
+                continue
+            next_due = now + self.poll_delay
+            ok, frame = cap.retrieve()
             if not ok:
                 break
-            outs = score_frame(frame)
-            if outs:
-                self.result_list.clear()
-                self.result_list.extend(outs)
-            time.sleep(self.poll_delay)
+            thumb = cv2.cvtColor(cv2.resize(frame, (160, 120)), cv2.COLOR_BGR2GRAY)
+            if prev is not None and cv2.absdiff(thumb, prev).mean() < MOTION_THRESH:
+                # nothing moved, so whoever was last seen is still there: keep re-sending them
+                if last_names is not None and now - last_put >= REEMIT_S:
+                    self.out_queue.put(last_names)
+                    last_put = now
+                continue
+            prev = thumb
+            labels, _ = score_frame(frame)
+            if not labels:
+                last_names = None  # nobody in view, nothing to re-send
+                continue
+            names = frozenset(labels)
+            if names != last_names or now - last_put >= REEMIT_S:
+                self.out_queue.put(names)
+                last_names, last_put = names, now
         cap.release()
 
     def stop(self):
@@ -1,8 +1,9 @@
 # modules/web/search_and_answer.py
 from __future__ import annotations
 import re, requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
-from urllib.parse import urlparse
+from urllib.parse import urlparse, parse_qs
 from bs4 import BeautifulSoup
 
 try:
@@ -10,6 +11,11 @@ try:
 except Exception:
     trafilatura = None
 
+try:
+    from selectolax.parser import HTMLParser  # optional, much faster parsing than BeautifulSoup
+except Exception:
+    HTMLParser = None
+
 from googlesearch import search as gsearch  # pip install googlesearch-python
 try:
     from ..ollama.ollama import humanize_search  # package run: python -m ...
@@ -21,14 +27,40 @@ except ImportError:
 
 UA = {"User-Agent": "Mozilla/5.0 (compatible; JarvisAI/1.0)"}
 
+# one pooled session so repeat hosts reuse their keep-alive connections; pool sized for gather_context's threads
+_SESSION = requests.Session()
+_SESSION.headers.update(UA)
+for _scheme in ("https://", "http://"):
+    _SESSION.mount(_scheme, requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+_DDG_URL = "https://html.duckduckgo.com/html/"
+
+def _ddg_search(query: str, timeout: float = 8.0) -> List[str]:
+    """Result URLs from DuckDuckGo's HTML page, over the pooled session; [] on any failure."""
+    try:
+        r = _SESSION.get(_DDG_URL, params={"q": query}, timeout=timeout)
+        r.raise_for_status()
+        hrefs = _links(_parse(r.text), "a.result__a")
+    except Exception:
+        return []
+    urls = []
+    for h in hrefs:
+        # organic results go through a redirect: //duckduckgo.com/l/?uddg=<target>; ads have no uddg and are dropped
+        target = parse_qs(urlparse(h).query).get("uddg")
+        if target:
+            urls.append(target[0])
+    return urls
+
 def google_search(query: str, num_results: int = 6, lang: str = "en") -> List[str]:
-    urls = [u for u in gsearch(query, num_results=num_results, lang=lang) if u.startswith("http")]
+    # DuckDuckGo first: one request on a kept-alive connection; googlesearch opens fresh ones every query
+    urls = _ddg_search(query) or list(gsearch(query, num_results=num_results, lang=lang))
+    urls = [u for u in urls if u.startswith("http")]
     seen, out = set(), []
     for u in urls:
         key = (urlparse(u).netloc, urlparse(u).path)
         if key not in seen:
             seen.add(key); out.append(u)
-    return out
+    return out[:num_results]
 
 def _is_html(resp: requests.Response) -> bool:
     ctype = resp.headers.get("content-type", "").lower()
@@ -37,20 +69,40 @@ def _is_html(resp: requests.Response) -> bool:
 def _clean(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip())
 
+def _parse(html: str):
+    return HTMLParser(html) if HTMLParser else BeautifulSoup(html, "lxml")
+
+def _title(tree) -> str:
+    if HTMLParser:
+        node = tree.css_first("title")
+        return node.text() if node else ""
+    return (tree.title.string or "") if tree.title else ""
+
+def _paragraphs(tree) -> List[str]:
+    if HTMLParser:
+        return [n.text(separator=" ", strip=True) for n in tree.css("p")]
+    return [p.get_text(" ", strip=True) for p in tree.find_all("p")]
+
+def _links(tree, selector: str) -> List[str]:
+    if HTMLParser:
+        return [n.attributes.get("href") or "" for n in tree.css(selector)]
+    return [a.get("href", "") for a in tree.select(selector)]
+
 def fetch_page(url: str, timeout: float = 8.0) -> Tuple[str, str]:
     """Return (title, text) or ('','') on failure/non-HTML."""
     try:
-        r = requests.get(url, headers=UA, timeout=timeout, allow_redirects=True)
+        r = _SESSION.get(url, timeout=timeout, allow_redirects=True)
         if not _is_html(r):
             return "", ""
         html = r.text
     except Exception:
         return "", ""
 
-    title = ""
+    # parse once; the same tree serves the title and the paragraph fallback
+    tree, title = None, ""
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        title = (soup.title.string or "").strip() if soup.title else ""
+        tree = _parse(html)
+        title = _title(tree).strip()
     except Exception:
         pass
 
@@ -60,10 +112,9 @@ def fetch_page(url: str, timeout: float = 8.0) -> Tuple[str, str]:
             text = trafilatura.extract(html, include_comments=False, url=url) or ""
         except Exception:
             text = ""
-    if not text:
+    if not text and tree is not None:
         try:
-            soup = BeautifulSoup(html, "html.parser")
-            ps = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
+            ps = _paragraphs(tree)
             ps = [p for p in ps if len(p.split()) > 5]
             text = "\n".join(ps[:8])
         except Exception:
@@ -71,9 +122,13 @@ def fetch_page(url: str, timeout: float = 8.0) -> Tuple[str, str]:
     return _clean(title), _clean(text)
 
 def gather_context(urls: List[str], per_source_chars: int = 1000, min_words: int = 40) -> List[Dict[str, str]]:
+    if not urls:
+        return []
+    # fetches are network-bound, so fetch every source at once; map keeps the search ranking order
+    with ThreadPoolExecutor(max_workers=min(8, len(urls))) as ex:
+        pages = list(ex.map(fetch_page, urls))
     ctx = []
-    for u in urls:
-        title, text = fetch_page(u)
+    for u, (title, text) in zip(urls, pages):
         if not text or len(text.split()) < min_words:
             continue
         if len(text) > per_source_chars:
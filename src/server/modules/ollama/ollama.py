@@ -3,6 +3,13 @@ import datetime
 from urllib.parse import urlparse
 import re
 
+MODEL = "llama3.2:3b-instruct-q4_K_M"
+KEEP_ALIVE = "30m"  # keep the model resident between questions instead of reloading it cold
+MAX_TOKENS = 1024  # runaway guard only; real answers end well before it
+
+_SOURCE_LINE_RE = re.compile(r"\[(\d+)]\s+(.*?)\s+—\s+(https?://\S+)")
+_CITE_RE = re.compile(r"\[(\d+)\]")
+
 def humanize_search(question: str, bundle: str, is_topic: bool) -> str:
     today = datetime.datetime.now().strftime("%B %d, %Y")
 
@@ -21,7 +28,7 @@ def humanize_search(question: str, bundle: str, is_topic: bool) -> str:
 
     def _brand_from_url(url: str) -> str:
         host = urlparse(url).netloc.lower()
-        host = re.sub(r"^www\.", "", host)
+        host = host.removeprefix("www.")
         parts = host.split(".")
         # use second-level domain as a readable fallback
         sld = parts[-2] if len(parts) >= 2 else parts[0]
@@ -30,7 +37,7 @@ def humanize_search(question: str, bundle: str, is_topic: bool) -> str:
     # parse [n] lines in bundle → {n: site_name}
     site_map: dict[int, str] = {}
     for line in bundle.splitlines():
-        m = re.match(r"\[(\d+)]\s+(.*?)\s+—\s+(https?://\S+)", line)
+        m = _SOURCE_LINE_RE.match(line)
         if m:
             n_str, title, url = m.groups()
             n = int(n_str)
@@ -55,12 +62,13 @@ def humanize_search(question: str, bundle: str, is_topic: bool) -> str:
     )
 
     r = ollama.chat(
-        model="llama3.2:3b-instruct-q4_K_M",
+        model=MODEL,
         messages=[
             {"role": "system", "content": sys},
             {"role": "user", "content": user}
         ],
-        options={"num_ctx": 4096}
+        keep_alive=KEEP_ALIVE,
+        options={"num_ctx": 4096, "num_predict": MAX_TOKENS}
     )
     answer = r["message"]["content"].strip()
 
@@ -69,7 +77,7 @@ def humanize_search(question: str, bundle: str, is_topic: bool) -> str:
         n = int(match.group(1))
         return site_map.get(n, f"source {n}")
 
-    answer = re.sub(r"\[(\d+)\]", _replace_cite, answer)
+    answer = _CITE_RE.sub(_replace_cite, answer)
 
     # For non-topic answers, prepend "According to X and Y, ..."
     if not is_topic:
@@ -1,11 +1,21 @@
 import time
 
-def ordinal(n: int) -> str:
+# English names rather than strftime("%B"): one localtime() read formats everything
+_MONTHS = ("January", "February", "March", "April", "May", "June", "July",
+           "August", "September", "October", "November", "December")
+
+def _ordinal_suffix(n: int) -> str:
     if 10 <= n % 100 <= 20:
-        suffix = "th"
-    else:
-        suffix = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
-    return f"{n}{suffix}"
+        return "th"
+    return {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+
+# days of the month are the only values asked for in practice
+_ORDINALS = tuple(f"{n}{_ordinal_suffix(n)}" for n in range(1, 32))
+
+def ordinal(n: int) -> str:
+    if 1 <= n <= 31:
+        return _ORDINALS[n - 1]
+    return f"{n}{_ordinal_suffix(n)}"
 
 def period_of_day(h_24: int) -> str:
     if h_24 < 12:
@@ -15,11 +25,12 @@ def period_of_day(h_24: int) -> str:
     else:
         return "in the evening"
 
-def fetch_time():
-    h_24 = int(time.strftime("%H"))
-    h_12 = int(time.strftime("%I"))
-    m = int(time.strftime("%M"))
-    am_pm = time.strftime("%p").lower()
+def fetch_time(t: time.struct_time | None = None):
+    t = t or time.localtime()
+    h_24 = t.tm_hour
+    h_12 = (h_24 - 1) % 12 + 1
+    m = t.tm_min
+    am_pm = "am" if h_24 < 12 else "pm"
 
     if m == 15:
         return f"It is quarter past {h_12} {period_of_day(h_24)}"
@@ -30,36 +41,49 @@ def fetch_time():
     else:
         return f"It is {h_12}:{m:02d}{am_pm}"
 
-def day_month():
-    d = int(time.strftime("%d"))
-    return f"It is the {ordinal(d)} of {time.strftime('%B')}"
+def day_month(t: time.struct_time | None = None):
+    t = t or time.localtime()
+    return f"It is the {ordinal(t.tm_mday)} of {_MONTHS[t.tm_mon - 1]}"
+
+def day_month_year(t: time.struct_time | None = None):
+    t = t or time.localtime()
+    return f"It is the {ordinal(t.tm_mday)} of {_MONTHS[t.tm_mon - 1]} {t.tm_year}"
 
-def day_month_year():
-    d = int(time.strftime("%d"))
-    return f"It is the {ordinal(d)} of {time.strftime('%B %Y')}"
+def _day_year(t: time.struct_time):
+    return f"It is the {ordinal(t.tm_mday)} of {t.tm_year}"
+
+def _month_year(t: time.struct_time):
+    return f"It is {_MONTHS[t.tm_mon - 1]} {t.tm_year}"
+
+def _month(t: time.struct_time):
+    return f"It is {_MONTHS[t.tm_mon - 1]}"
+
+def _year(t: time.struct_time):
+    return f"It is {t.tm_year}"
+
+# keyword -> bit; a message's bits index _REPLIES, so any mention of "time" wins
+_KEYWORD_BITS = (("time", 1), ("day", 2), ("month", 4), ("year", 8))
+_DATE_REPLIES = {
+    2 | 4 | 8: day_month_year,
+    2 | 4: day_month,
+    2 | 8: _day_year,
+    2: day_month,
+    4 | 8: _month_year,
+    4: _month,
+    8: _year,
+}
+_REPLIES = tuple(fetch_time if flags & 1 else _DATE_REPLIES.get(flags) for flags in range(16))
 
 def build_time_message(msg: str):
     msg_lower = msg.lower()
-
-    if "time" in msg_lower:
-        return fetch_time()
-    elif "day" in msg_lower and "month" in msg_lower and "year" in msg_lower:
-        return day_month_year()
-    elif "day" in msg_lower and "month" in msg_lower:
-        return day_month()
-    elif "day" in msg_lower and "year" in msg_lower:
-        d = int(time.strftime("%d"))
-        return f"It is the {ordinal(d)} of {time.strftime('%Y')}"
-    elif "day" in msg_lower:
-        return day_month()
-    elif "month" in msg_lower and "year" in msg_lower:
-        return f"It is {time.strftime('%B %Y')}"
-    elif "month" in msg_lower:
-        return f"It is {time.strftime('%B')}"
-    elif "year" in msg_lower:
-        return f"It is {time.strftime('%Y')}"
-    else:
+    flags = 0
+    for kw, bit in _KEYWORD_BITS:
+        if kw in msg_lower:
+            flags |= bit
+    reply = _REPLIES[flags]
+    if reply is None:
         return "I don't understand the request."
+    return reply(time.localtime())  # one snapshot, so fields can't straddle midnight
 
 
 
@@ -1,6 +1,4 @@
 import os
-import time
-import wave
 import threading
 from pathlib import Path
 import simpleaudio as audio
@@ -11,19 +9,30 @@ MODEL_PATH = os.getenv(
     "C:/Projects/home_ai_assistant/src/assets/en_GB-alba-medium.onnx",
 )
 
-_voice = PiperVoice.load(MODEL_PATH)
-_audio_dir = Path("temp_audio")
-_audio_dir.mkdir(parents=True, exist_ok=True)
 
+def _load_voice(model_path: str) -> PiperVoice:
+    # tools/quantize_piper_voice.py writes an int8 copy beside the model; it reuses the fp32 model's config
+    int8 = Path(model_path).with_suffix(".int8.onnx")
+    if int8.exists():
+        return PiperVoice.load(int8, config_path=f"{model_path}.json")
+    return PiperVoice.load(model_path)
 
-def speak(message: str) -> str:
-    filename = _audio_dir / f"tts_{int(time.time() * 1000)}.wav"
-    with wave.open(str(filename), "wb") as f:
-        _voice.synthesize_wav(message, f)
-    wave_obj = audio.WaveObject.from_wave_file(str(filename))
-    play_obj = wave_obj.play()
-    play_obj.wait_done()
-    return str(filename)
+
+_voice = _load_voice(MODEL_PATH)
+
+
+def speak(message: str) -> None:
+    # Piper yields one chunk per sentence; play each as soon as it's ready so the
+    # next sentence is synthesized while this one is still playing
+    play_obj = None
+    for chunk in _voice.synthesize(message):
+        if play_obj is not None:
+            play_obj.wait_done()
+        play_obj = audio.play_buffer(
+            chunk.audio_int16_bytes, chunk.sample_channels, chunk.sample_width, chunk.sample_rate
+        )
+    if play_obj is not None:
+        play_obj.wait_done()
 
 
 def speak_async(message: str) -> None:
@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+# Writes <model>.int8.onnx next to the Piper voice; voice_synth loads it instead of the fp32 model when present.
+# Only MatMul/Gemm weights (the text encoder) are quantized: the vocoder's convolutions stay fp32, as int8
+# there is audible.
+
+model = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent / ".." / "src" / "assets" / "en_GB-alba-medium.onnx"
+out = model.with_suffix(".int8.onnx")
+
+quantize_dynamic(str(model), str(out), weight_type=QuantType.QInt8, op_types_to_quantize=["MatMul", "Gemm"])
+print(f"wrote {out.resolve()}")